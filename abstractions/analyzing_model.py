@@ -1,10 +1,124 @@
 from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+import json
+import os
+import threading
+import time
 import joblib
+import numpy as np
 from sklearn.preprocessing import MinMaxScaler
 import tensorflow as tf
 
+# Тип точек ряда на всём пути от выборки до инференса: в нём же работают модели.
+SERIES_DTYPE = np.float32
+
+
+class SeriesScaler(MinMaxScaler):
+    # MinMaxScaler, принимающий и возвращающий ряд в SERIES_DTYPE: масштабированные
+    # данные и окна над ними сразу имеют тип входа модели и не копируются при касте.
+    def fit(self, X, y=None):
+        return super().fit(np.asarray(X, dtype=SERIES_DTYPE), y)
+
+    def partial_fit(self, X, y=None):
+        return super().partial_fit(np.asarray(X, dtype=SERIES_DTYPE), y)
+
+    def transform(self, X):
+        return super().transform(np.asarray(X, dtype=SERIES_DTYPE))
+
+    def inverse_transform(self, X):
+        return super().inverse_transform(np.asarray(X, dtype=SERIES_DTYPE))
+
+    @classmethod
+    def upgrade(cls, scaler):
+        # Артефакты до перехода на float32 содержат обычный MinMaxScaler.
+        if isinstance(scaler, cls):
+            return scaler
+        upgraded = cls()
+        upgraded.__dict__.update(scaler.__dict__)
+        return upgraded
+
+
+def sliding_windows(data, window_size):
+    # Окна строятся как read-only view поверх исходного массива, без копирования точек.
+    data = np.asarray(data)
+    if len(data) <= window_size:
+        return np.empty((0, window_size) + data.shape[1:], dtype=data.dtype)
+    windows = np.lib.stride_tricks.sliding_window_view(
+        data[:-1], window_size, axis=0
+    )
+    return np.moveaxis(windows, -1, 1)
+
+
+def window_dataset(
+    series,
+    window_size,
+    forecast_mode="recursive",
+    output_horizon=1,
+    batch_size=32,
+    shuffle=False,
+):
+    # Окна собираются по индексам прямо из тензора ряда внутри tf.data,
+    # поэтому в памяти хранится только сам ряд и перемешанные индексы.
+    series = tf.constant(series, dtype=tf.float32)
+    samples = int(series.shape[0]) - window_size - output_horizon + 1
+    if samples <= 0:
+        raise ValueError("Not enough data to build training windows")
+    window_offsets = tf.range(window_size, dtype=tf.int64)
+    target_offsets = tf.range(output_horizon, dtype=tf.int64) + window_size
+
+    def windows_and_targets(indices):
+        windows = tf.gather(series, indices[:, None] + window_offsets)
+        if forecast_mode == "recursive":
+            return windows, tf.gather(series, indices + window_size)
+        return windows, tf.gather(series[:, 0], indices[:, None] + target_offsets)
+
+    dataset = tf.data.Dataset.range(samples)
+    if shuffle:
+        dataset = dataset.shuffle(samples, reshuffle_each_iteration=True)
+    return (
+        dataset.batch(batch_size)
+        .map(windows_and_targets, num_parallel_calls=tf.data.AUTOTUNE)
+        .prefetch(tf.data.AUTOTUNE)
+    )
+
+
+def residual_sums(predictions, targets):
+    # Суммы складываются между запусками, поэтому метрики анализа
+    # можно досчитывать по новым точкам.
+    errors = predictions - targets
+    return {
+        "count": len(errors),
+        "squared_error": float(np.sum(errors**2)),
+        "absolute_error": float(np.sum(np.abs(errors))),
+    }
+
+
+FORECAST_MODES = ("recursive", "direct")
+SCALER_UPDATES = ("freeze", "extend")
+TFLITE_QUANTIZATIONS = ("none", "dynamic", "float16")
+INFERENCE_BACKENDS = ("keras", "tflite")
+
 
 class AnalyzingModel(ABC):
+    version = None
+    watermark = None
+    trained_points = 0
+    scaler_update = "freeze"
+    batch_size = 32
+    tflite_quantization = None
+    inference_backend = "keras"
+    tflite_convertible = True
+    tflite_artifact = None
+    tflite_max_delta = None
+    tflite_tolerance = 1e-2
+    artifact_extension = "keras"
+    # Модели с календарными признаками получают метки времени ряда через timestamps.
+    uses_calendar = False
+    # Уровни квантилей выходов модели; первым всегда идёт медиана — точечный прогноз.
+    quantiles = None
+    # Планировщик, объединяющий окна одновременных запросов в общий батч.
+    inference_scheduler = None
+
     @abstractmethod
     def train(self, data):
         pass
@@ -17,17 +131,373 @@ class AnalyzingModel(ABC):
     def analyze(self, data):
         pass
 
+    @abstractmethod
+    def _metrics(self, sums, last_predictions):
+        pass
+
+    def _analysis(self, scaled_data, predictions):
+        sums = residual_sums(predictions, scaled_data[self.window_size :])
+        return self._metrics(sums, predictions[-2:])
+
+    def _in_sample(self, data, start, **inputs):
+        # Предсказания для точек data[start:] по окнам из предшествующих им точек.
+        scaled_data = self.scaler.transform(data[start - self.window_size :])
+        X = self._preprocess(scaled_data)
+        return scaled_data[self.window_size :], self._predict_windows(X)
+
+    def analyze_increment(self, data, state=None, **inputs):
+        # state описывает анализ первых state["points"] точек того же ряда:
+        # инференс идёт только по новым окнам, суммы остатков дополняются.
+        start = self.window_size if state is None else state["points"]
+        if start < self.window_size or start > len(data):
+            raise ValueError("Analysis state does not match the series")
+        if start < len(data):
+            targets, predictions = self._in_sample(data, start, **inputs)
+        else:
+            targets = predictions = np.empty((0, 1))
+        sums = residual_sums(predictions, targets)
+        last_predictions = predictions[-2:]
+        if state is not None:
+            sums = {name: state["sums"][name] + value for name, value in sums.items()}
+            last_predictions = np.concatenate(
+                [np.reshape(state["last_predictions"], (-1, 1)), last_predictions]
+            )[-2:]
+        state = {
+            "points": len(data),
+            "sums": sums,
+            "last_predictions": last_predictions[:, 0].tolist(),
+        }
+        return self._metrics(sums, last_predictions), state, predictions
+
+    def _inverse_transform(self, outputs):
+        # Все колонки выхода (медиана и квантили) — значения одного и того же ряда.
+        return self.scaler.inverse_transform(outputs.reshape(-1, 1)).reshape(outputs.shape)
+
+    def _check_forecast_mode(self):
+        if self.forecast_mode not in FORECAST_MODES:
+            raise ValueError(f"Unsupported forecast mode: {self.forecast_mode}")
+        if self.forecast_mode == "recursive":
+            self.output_horizon = 1
+
+    def _check_inference_backend(self):
+        if (
+            self.tflite_quantization is not None
+            and self.tflite_quantization not in TFLITE_QUANTIZATIONS
+        ):
+            raise ValueError(
+                f"Unsupported TFLite quantization: {self.tflite_quantization}"
+            )
+        if self.inference_backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Unsupported inference backend: {self.inference_backend}")
+
+    def _preprocess(self, data):
+        return sliding_windows(data, self.window_size)
+
+    @property
+    def predict_lookback(self):
+        # Прогноз строится только по последнему окну; None — модели нужен весь ряд.
+        return self.window_size
+
+    def _prediction_tail(self, data):
+        if len(data) < self.window_size:
+            raise ValueError(
+                f"At least {self.window_size} points are required for a forecast"
+            )
+        if self.predict_lookback is None:
+            return data
+        return data[-self.predict_lookback :]
+
+    def _inference_function(self):
+        if getattr(self, "_inference_model", None) is not self.model:
+            keras_model = self.model
+            self._traced_model = tf.function(
+                lambda x: keras_model(x, training=False), jit_compile=True
+            )
+            self._inference_fn = self._traced_model.get_concrete_function(
+                tf.TensorSpec(
+                    shape=(None, self.window_size, self.features), dtype=tf.float32
+                )
+            )
+            self._inference_model = keras_model
+        return self._inference_fn
+
+    def build_inference(self):
+        if getattr(self, "_tflite_interpreter", None) is None:
+            self._inference_function()
+
+    def _infer(self, windows):
+        if self.inference_scheduler is not None:
+            return self.inference_scheduler.infer(self, windows)
+        return self._forward(windows)
+
+    def _forward(self, windows):
+        if windows.dtype != SERIES_DTYPE:
+            raise TypeError(f"Expected {np.dtype(SERIES_DTYPE)} windows, got {windows.dtype}")
+        if getattr(self, "_tflite_interpreter", None) is not None:
+            return self._tflite_infer(windows)
+        inputs = tf.convert_to_tensor(windows)
+        return self._inference_function()(inputs).numpy()
+
+    @staticmethod
+    def inference_batch_sizes(max_batch_size=1024):
+        # Формы входа, которые может породить _predict_windows при дополнении до степени двойки.
+        return [1 << power for power in range(max_batch_size.bit_length())]
+
+    def warm_up(self, batch_sizes=None):
+        self.build_inference()
+        timings = {}
+        for batch_size in batch_sizes or self.inference_batch_sizes():
+            windows = np.zeros(
+                (batch_size, self.window_size, self.features), dtype=SERIES_DTYPE
+            )
+            started = time.perf_counter()
+            self._forward(windows)
+            timings[batch_size] = round((time.perf_counter() - started) * 1000, 3)
+        return timings
+
+    def _tflite_infer(self, windows):
+        with self._tflite_lock:
+            return self._invoke_interpreter(self._tflite_interpreter, windows)
+
+    @staticmethod
+    def _invoke_interpreter(interpreter, windows):
+        windows = np.asarray(windows, dtype=np.float32)
+        input_details = interpreter.get_input_details()[0]
+        if tuple(input_details["shape"]) != windows.shape:
+            interpreter.resize_tensor_input(input_details["index"], windows.shape)
+            interpreter.allocate_tensors()
+        interpreter.set_tensor(input_details["index"], windows)
+        interpreter.invoke()
+        output_index = interpreter.get_output_details()[0]["index"]
+        return interpreter.get_tensor(output_index).copy()
+
+    @staticmethod
+    def _make_interpreter(model_content):
+        interpreter = tf.lite.Interpreter(model_content=model_content)
+        interpreter.allocate_tensors()
+        return interpreter
+
+    def _use_tflite(self, model_content):
+        self._tflite_lock = threading.Lock()
+        self._tflite_interpreter = self._make_interpreter(model_content)
+
+    def _convert_tflite(self):
+        converter = tf.lite.TFLiteConverter.from_keras_model(self.model)
+        if self.tflite_quantization in ("dynamic", "float16"):
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if self.tflite_quantization == "float16":
+            converter.target_spec.supported_types = [tf.float16]
+        return converter.convert()
+
+    def _tflite_delta(self, model_content):
+        windows = getattr(self, "_calibration_windows", None)
+        if windows is None or len(windows) == 0:
+            windows = np.random.default_rng(0).random(
+                (256, self.window_size, self.features)
+            )
+        windows = tf.convert_to_tensor(windows, dtype=tf.float32)
+        expected = self._inference_function()(windows).numpy()
+        interpreter = self._make_interpreter(model_content)
+        actual = self._invoke_interpreter(interpreter, windows.numpy())
+        return float(np.max(np.abs(actual - expected)))
+
+    def _export_tflite(self, path, model_type):
+        # Экспорт best-effort: если модель не конвертируется во встроенные
+        # операции TFLite, инференс остаётся на Keras.
+        self.tflite_artifact = None
+        self.tflite_max_delta = None
+        if self.tflite_quantization is None or not self.tflite_convertible:
+            return None
+        try:
+            model_content = self._convert_tflite()
+            delta = self._tflite_delta(model_content)
+        except Exception as e:
+            return f"TFLite export failed: {e}"
+        with open(f"{path}/{model_type}_model.tflite", "wb") as f:
+            f.write(model_content)
+        self.tflite_artifact = self.tflite_quantization
+        self.tflite_max_delta = delta
+        return None
+
+    def _load_tflite(self, path, model_type):
+        self._tflite_interpreter = None
+        if self.inference_backend != "tflite" or self.tflite_artifact is None:
+            return
+        if self.tflite_max_delta is None or self.tflite_max_delta > self.tflite_tolerance:
+            return
+        with open(f"{path}/{model_type}_model.tflite", "rb") as f:
+            self._use_tflite(f.read())
+
+    @property
+    def active_backend(self):
+        if getattr(self, "_tflite_interpreter", None) is not None:
+            return "tflite"
+        return "keras"
+
+    def _infer_batches(self, windows, batch_size=1024):
+        # Батчи дополняются до степени двойки, чтобы XLA компилировал
+        # ограниченный набор форм входа.
+        outputs = []
+        for start in range(0, len(windows), batch_size):
+            batch = windows[start : start + batch_size]
+            padded_size = 1 << (len(batch) - 1).bit_length()
+            if padded_size != len(batch):
+                padding = np.repeat(batch[-1:], padded_size - len(batch), axis=0)
+                batch = np.concatenate([batch, padding])
+            outputs.append(self._infer(batch)[: len(windows) - start])
+        return outputs
+
+    def _predict_windows(self, windows, batch_size=1024):
+        predictions = self._infer_batches(windows, batch_size)
+        if not predictions:
+            return np.empty((0, 1), dtype=np.float32)
+        return np.concatenate(predictions)[:, :1]
+
+    def _forecast(self, scaled_data, horizon):
+        return self._forecast_windows(scaled_data[np.newaxis, -self.window_size :], horizon)[0]
+
+    def _forecast_windows(self, windows, horizon):
+        # Прогнозы сразу от нескольких окон: каждый шаг рекурсии — один батч.
+        # Выход модели — блоки по output_horizon шагов на каждый квантиль,
+        # медианный блок первый; в окно при рекурсии подаётся медиана.
+        current_windows = np.array(windows)
+        predictions = np.empty((len(windows), horizon, len(self.quantiles or [0.5])))
+        produced = 0
+        while produced < horizon:
+            outputs = np.concatenate(self._infer_batches(current_windows))
+            outputs = outputs.reshape(len(windows), -1, self.output_horizon).transpose(0, 2, 1)
+            steps = min(outputs.shape[1], horizon - produced)
+            predictions[:, produced : produced + steps] = outputs[:, :steps]
+            produced += steps
+            current_windows = np.concatenate(
+                [current_windows, outputs[:, :, :1].reshape(len(windows), -1, self.features)],
+                axis=1,
+            )[:, -self.window_size :]
+        if self.quantiles:
+            # Головы квантилей обучаются независимо и могут пересекаться.
+            order = np.argsort(self.quantiles)
+            predictions[..., order] = np.sort(predictions, axis=-1)
+        return predictions
+
+    def predict_origins(self, data, origins, horizon=5):
+        # Прогнозы с нескольких точек отсечения одного ряда (бэктест): ряд масштабируется
+        # один раз, окна берутся из общего view, а рекурсия идёт батчем по всем точкам.
+        windows = self._origin_windows(self.scaler.transform(data), origins)
+        return self._inverse_transform(self._forecast_windows(windows, horizon))
+
+    def _origin_windows(self, data, origins):
+        # Окно точки отсечения origin — window_size точек перед ней.
+        starts = np.asarray(origins) - self.window_size
+        if starts.min() < 0:
+            raise ValueError(
+                f"At least {self.window_size} points are required for a forecast"
+            )
+        return sliding_windows(data, self.window_size)[starts]
+
+    @property
+    def fine_tune_lookback(self):
+        # None — модель дообучается по всей истории, а не по хвосту с новыми точками.
+        return self.window_size + self.output_horizon - 1
+
+    def fine_tune(self, data, epochs=3, callbacks=None, timestamps=None):
+        if self.scaler_update not in SCALER_UPDATES:
+            raise ValueError(f"Unsupported scaler update rule: {self.scaler_update}")
+        lookback = self.fine_tune_lookback
+        new_data = data[self.trained_points if lookback is None else lookback :]
+        if len(new_data) == 0:
+            raise ValueError("No new data for fine-tuning")
+        if self.scaler_update == "extend":
+            self.scaler.partial_fit(new_data)
+        self._fit_increment(self.scaler.transform(data), epochs, callbacks, timestamps)
+        self.trained_points += len(new_data)
+        return {"status": "success", "message": "Model fine-tuned successfully"}
+
+    def _fit_increment(self, scaled_data, epochs, callbacks, timestamps=None):
+        self._tflite_interpreter = None
+        self.model.fit(
+            self._training_dataset(scaled_data),
+            epochs=epochs,
+            callbacks=callbacks,
+            verbose=0,
+        )
+
+    def _training_dataset(self, scaled_data, shuffle=True):
+        # Последние окна обучения используются для сверки TFLite-модели с Keras.
+        self._calibration_windows = self._preprocess(scaled_data)[-256:]
+        return window_dataset(
+            scaled_data,
+            self.window_size,
+            self.forecast_mode,
+            self.output_horizon,
+            batch_size=self.batch_size,
+            shuffle=shuffle,
+        )
+
+    def _config(self):
+        return {
+            "window_size": self.window_size,
+            "features": self.features,
+            "forecast_mode": self.forecast_mode,
+            "output_horizon": self.output_horizon,
+            "version": self.version,
+            "watermark": self.watermark,
+            "trained_points": self.trained_points,
+            "scaler_update": self.scaler_update,
+            "tflite_artifact": self.tflite_artifact,
+            "tflite_max_delta": self.tflite_max_delta,
+        }
+
+    def memory_footprint(self):
+        variables = self.model.weights
+        if self.model.optimizer is not None:
+            variables = variables + self.model.optimizer.variables
+        return sum(
+            int(np.prod(variable.shape)) * np.dtype(variable.dtype).itemsize
+            for variable in variables
+        )
+
+    @classmethod
+    def has_artifact(cls, path):
+        model_type = cls.__name__.replace("Model", "").lower()
+        return os.path.exists(f"{path}/{model_type}_model.{cls.artifact_extension}")
+
+    def _save_model(self, path, model_type):
+        self.model.save(f"{path}/{model_type}_model.keras")
+
+    def _load_model(self, path, model_type):
+        self.model = tf.keras.models.load_model(f"{path}/{model_type}_model.keras")
+
     def save(self, path):
         model_type = self.__class__.__name__.replace("Model", "").lower()
-        self.model.save(f"{path}/{model_type}_model.keras")
+        self.version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        self._save_model(path, model_type)
         joblib.dump(self.scaler, f"{path}/scaler.joblib")
-        return {"status": "success", "path": path}
+        tflite_error = self._export_tflite(path, model_type)
+        with open(f"{path}/{model_type}_config.json", "w") as f:
+            json.dump(self._config(), f)
+        self._load_tflite(path, model_type)
+        result = {"status": "success", "path": path}
+        if self.tflite_artifact is not None:
+            result["tflite_max_delta"] = self.tflite_max_delta
+        if tflite_error is not None:
+            result["tflite_error"] = tflite_error
+        return result
 
     def load(self, path):
         model_type = self.__class__.__name__.replace("Model", "").lower()
-        self.model = tf.keras.models.load_model(f"{path}/{model_type}_model.keras")
+        self._load_model(path, model_type)
         try:
-            self.scaler = joblib.load(f"{path}/scaler.joblib")
+            self.scaler = SeriesScaler.upgrade(joblib.load(f"{path}/scaler.joblib"))
         except (FileNotFoundError, ValueError):
-            self.scaler = MinMaxScaler()
+            self.scaler = SeriesScaler()
+        config_file = f"{path}/{model_type}_config.json"
+        if os.path.exists(config_file):
+            with open(config_file, "r") as f:
+                for name, value in json.load(f).items():
+                    setattr(self, name, value)
+        else:
+            self.output_horizon = self.model.output_shape[-1]
+            self.forecast_mode = "direct" if self.output_horizon > 1 else "recursive"
+            self.version = str(os.path.getmtime(f"{path}/{model_type}_model.keras"))
+        self._load_tflite(path, model_type)
         return {"status": "success", "path": path}
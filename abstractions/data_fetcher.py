@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar, List
+import importlib.util
+from typing import Generic, TypeVar, List, Optional
+import httpx
 from logger import Logger
 
 T = TypeVar("T")
@@ -8,14 +10,59 @@ T = TypeVar("T")
 class DataFetcher(ABC, Generic[T]):
     _url: str
     _params: dict
+    _client: Optional[httpx.AsyncClient]
     _logger: Logger
 
+    def __init__(
+        self,
+        http2: bool = False,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 5,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 10.0,
+        transport: httpx.AsyncBaseTransport = None,
+    ):
+        self._http2 = http2
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._timeout = httpx.Timeout(timeout)
+        self._transport = transport
+        self._client = None
+
     async def fetch_data(self) -> List[T]:
         raw_data = await self._get_raw_data()
         records = self.parse_data(raw_data)
         self._logger.info(f"Fetched data: {records}")
         return records
 
+    def _http_client(self) -> httpx.AsyncClient:
+        # Один клиент на сервис: соединения с источником держатся keep-alive
+        # и переиспользуются, а не открываются заново на каждый запрос.
+        if self._client is None or self._client.is_closed:
+            http2 = self._http2 and importlib.util.find_spec("h2") is not None
+            if self._http2 and not http2:
+                self._logger.warning("Package h2 is not installed, falling back to HTTP/1.1")
+            self._client = httpx.AsyncClient(
+                http2=http2,
+                limits=self._limits,
+                timeout=self._timeout,
+                transport=self._transport,
+            )
+        return self._client
+
+    async def _get(self, url: str) -> httpx.Response:
+        response = await self._http_client().get(url)
+        response.raise_for_status()
+        return response
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
     @abstractmethod
     async def _get_raw_data(self) -> dict:
         pass
@@ -0,0 +1,68 @@
+# Запуск из корня репозитория: python -m benchmarks.inference_benchmark
+import tempfile
+import time
+import numpy as np
+from concrete.analyzing_models.cnn import CNNModel
+from concrete.analyzing_models.rnn import RNNModel
+from concrete.analyzing_models.tft import TFTModel
+
+WINDOW_SIZE = 30
+REPEATS = 200
+
+
+def per_call_ms(function, repeats=REPEATS):
+    function()
+    started = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - started) / repeats * 1000
+
+
+def tflite_timings(model_class, keras_model, window):
+    timings = []
+    for quantization in ("none", "dynamic", "float16"):
+        model = model_class(
+            window_size=WINDOW_SIZE,
+            features=1,
+            tflite_quantization=quantization,
+            inference_backend="tflite",
+        )
+        model.model = keras_model
+        model.scaler.fit(np.array([[0.0], [1.0]]))
+        with tempfile.TemporaryDirectory() as path:
+            model.save(path)
+        tflite_ms = per_call_ms(lambda: model._infer(window))
+        timings.append((quantization, tflite_ms, model.tflite_max_delta))
+    return timings
+
+
+def main():
+    window = np.random.rand(1, WINDOW_SIZE, 1).astype(np.float32)
+    rows = []
+    for name, model_class in [("cnn", CNNModel), ("rnn", RNNModel), ("tft", TFTModel)]:
+        model = model_class(window_size=WINDOW_SIZE, features=1)
+        model.build_inference()
+        keras_ms = per_call_ms(lambda: model.model.predict(window, verbose=0), 20)
+        compiled_ms = per_call_ms(lambda: model._infer(window))
+        assert np.allclose(model.model.predict(window, verbose=0), model._infer(window), atol=1e-5)
+        timings = [("-", None, None)]
+        if model_class.tflite_convertible:
+            timings = tflite_timings(model_class, model.model, window)
+        for quantization, tflite_ms, delta in timings:
+            rows.append((name, keras_ms, compiled_ms, quantization, tflite_ms, delta))
+
+    print(
+        f"{'model':<6} | {'keras predict, ms':>18} | {'compiled, ms':>13} | "
+        f"{'tflite':>7} | {'tflite, ms':>10} | {'max delta':>9}"
+    )
+    for name, keras_ms, compiled_ms, quantization, tflite_ms, delta in rows:
+        tflite = "-" if tflite_ms is None else f"{tflite_ms:.3f}"
+        delta = "-" if delta is None else f"{delta:.2e}"
+        print(
+            f"{name:<6} | {keras_ms:>18.3f} | {compiled_ms:>13.3f} | "
+            f"{quantization:>7} | {tflite:>10} | {delta:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# Запуск из корня репозитория: python -m benchmarks.micro_batching_benchmark
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from concrete.analyzing_models.cnn import CNNModel
+from concrete.analyzing_models.tft import TFTModel
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "services", "analyzer"))
+from inference_scheduler import InferenceScheduler
+
+WINDOW_SIZE = 30
+REQUESTS = 2000
+
+
+def throughput(model, clients):
+    windows = np.random.rand(REQUESTS, 1, WINDOW_SIZE, 1).astype(np.float32)
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(model._infer, windows[:clients]))
+        started = time.perf_counter()
+        list(executor.map(model._infer, windows))
+    return REQUESTS / (time.perf_counter() - started)
+
+
+def main():
+    os.makedirs("logs", exist_ok=True)
+    print(f"{'model':<6} {'clients':>8} {'direct req/s':>13} {'batched req/s':>14} {'req/batch':>10}")
+    for name, model_class in [("cnn", CNNModel), ("tft", TFTModel)]:
+        model = model_class(window_size=WINDOW_SIZE)
+        model.warm_up()
+        for clients in (1, 8, 32):
+            model.inference_scheduler = None
+            direct = throughput(model, clients)
+            scheduler = InferenceScheduler(max_batch=256, max_wait_ms=2)
+            model.inference_scheduler = scheduler
+            batched = throughput(model, clients)
+            print(
+                f"{name:<6} {clients:>8} {direct:>13.0f} {batched:>14.0f} "
+                f"{scheduler.stats()['mean_batch_requests']:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
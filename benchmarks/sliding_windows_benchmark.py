@@ -0,0 +1,49 @@
+# Запуск из корня репозитория: python -m benchmarks.sliding_windows_benchmark
+import time
+import tracemalloc
+import numpy as np
+from abstractions.analyzing_model import sliding_windows
+
+WINDOW_SIZE = 30
+SERIES_LENGTHS = [1_000, 26_280, 100_000]
+
+
+def loop_windows(data, window_size):
+    sequences = []
+    for i in range(len(data) - window_size):
+        sequences.append(data[i : i + window_size])
+    return np.array(sequences)
+
+
+def measure(function, *args):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    print(
+        f"{'points':>10} | {'method':<16} | {'time, ms':>10} | {'peak memory, MB':>16}"
+    )
+    for length in SERIES_LENGTHS:
+        data = np.random.rand(length, 1)
+
+        expected, loop_time, loop_peak = measure(loop_windows, data, WINDOW_SIZE)
+        windows, view_time, view_peak = measure(sliding_windows, data, WINDOW_SIZE)
+        assert np.array_equal(expected, windows)
+
+        for method, elapsed, peak in [
+            ("python loop", loop_time, loop_peak),
+            ("strided view", view_time, view_peak),
+        ]:
+            print(
+                f"{length:>10} | {method:<16} | {elapsed * 1000:>10.2f} | {peak / 2**20:>16.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Запуск из корня репозитория: python -m benchmarks.training_pipeline_benchmark
+import time
+import numpy as np
+from abstractions.analyzing_model import sliding_windows, window_dataset
+from concrete.analyzing_models.cnn import CNNModel
+
+WINDOW_SIZE = 168
+HORIZON = 30
+SERIES_LENGTH = 26_280
+BATCH_SIZES = [32, 256]
+
+
+def materialized(data, batch_size):
+    windows = np.array(sliding_windows(data, WINDOW_SIZE), dtype=np.float32)
+    targets = np.lib.stride_tricks.sliding_window_view(data[WINDOW_SIZE:, 0], HORIZON)
+    windows = windows[: len(targets)]
+    return (windows, targets), windows.nbytes + targets.nbytes
+
+
+def streamed(data, batch_size):
+    dataset = window_dataset(
+        data, WINDOW_SIZE, "direct", HORIZON, batch_size=batch_size, shuffle=True
+    )
+    return (dataset,), data.astype(np.float32).nbytes
+
+
+def epoch_seconds(inputs, batch_size):
+    model = CNNModel(
+        window_size=WINDOW_SIZE, forecast_mode="direct", output_horizon=HORIZON
+    )
+    fit_kwargs = {} if len(inputs) == 1 else {"batch_size": batch_size, "shuffle": True}
+    model.model.fit(*inputs, epochs=1, verbose=0, **fit_kwargs)
+    started = time.perf_counter()
+    model.model.fit(*inputs, epochs=1, verbose=0, **fit_kwargs)
+    return time.perf_counter() - started
+
+
+def main():
+    data = np.random.rand(SERIES_LENGTH, 1)
+    rows = []
+    for batch_size in BATCH_SIZES:
+        for name, build in [("numpy arrays", materialized), ("tf.data", streamed)]:
+            inputs, input_bytes = build(data, batch_size)
+            seconds = epoch_seconds(inputs, batch_size)
+            rows.append((batch_size, name, seconds, input_bytes))
+
+    print(f"{'batch':>6} | {'input':<12} | {'epoch, s':>9} | {'input memory, MB':>17}")
+    for batch_size, name, seconds, input_bytes in rows:
+        print(
+            f"{batch_size:>6} | {name:<12} | {seconds:>9.2f} | {input_bytes / 2**20:>17.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
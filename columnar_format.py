@@ -0,0 +1,61 @@
+import json
+import struct
+from typing import Dict, Tuple
+import numpy as np
+
+# Бинарный колоночный формат для передачи рядов между сервисами:
+# сигнатура, длина JSON-заголовка, заголовок с описанием колонок и сами колонки
+# little-endian, выровненные по 8 байт, чтобы их можно было читать через np.frombuffer без копирования.
+MEDIA_TYPE = "application/vnd.columnar"
+SIGNATURE = b"COLS"
+ALIGNMENT = 8
+
+
+def accepts_columnar(accept: str) -> bool:
+    return accept is not None and MEDIA_TYPE in accept
+
+
+def _aligned(size: int) -> int:
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def encode_columns(columns: Dict[str, np.ndarray], metadata: dict = None) -> bytes:
+    descriptions = []
+    buffers = []
+    offset = 0
+    for name, column in columns.items():
+        column = np.ascontiguousarray(column)
+        column = column.astype(column.dtype.newbyteorder("<"), copy=False)
+        descriptions.append(
+            {
+                "name": name,
+                "dtype": column.dtype.str,
+                "length": len(column),
+                "offset": offset,
+            }
+        )
+        data = column.tobytes()
+        buffers.append(data + b"\0" * (_aligned(len(data)) - len(data)))
+        offset += _aligned(len(data))
+    header = json.dumps({"columns": descriptions, "metadata": metadata or {}}).encode()
+    prefix_size = len(SIGNATURE) + 4
+    header += b" " * (_aligned(prefix_size + len(header)) - prefix_size - len(header))
+    return b"".join([SIGNATURE, struct.pack("<I", len(header)), header, *buffers])
+
+
+def decode_columns(payload: bytes) -> Tuple[Dict[str, np.ndarray], dict]:
+    if payload[: len(SIGNATURE)] != SIGNATURE:
+        raise ValueError("Not a columnar payload")
+    (header_size,) = struct.unpack_from("<I", payload, len(SIGNATURE))
+    body_start = len(SIGNATURE) + 4 + header_size
+    header = json.loads(bytes(payload[len(SIGNATURE) + 4 : body_start]))
+    columns = {
+        description["name"]: np.frombuffer(
+            payload,
+            dtype=np.dtype(description["dtype"]),
+            count=description["length"],
+            offset=body_start + description["offset"],
+        )
+        for description in header["columns"]
+    }
+    return columns, header["metadata"]
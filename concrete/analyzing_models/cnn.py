@@ -1,15 +1,29 @@
 import tensorflow as tf
-import numpy as np
-from abstractions.analyzing_model import AnalyzingModel
-from sklearn.preprocessing import MinMaxScaler
+from abstractions.analyzing_model import AnalyzingModel, SeriesScaler
 
 
 class CNNModel(AnalyzingModel):
-    def __init__(self, window_size=30, features=1):
+    def __init__(
+        self,
+        window_size=30,
+        features=1,
+        forecast_mode="recursive",
+        output_horizon=1,
+        tflite_quantization=None,
+        inference_backend="keras",
+        batch_size=32,
+    ):
         self.window_size = window_size
         self.features = features
+        self.forecast_mode = forecast_mode
+        self.output_horizon = output_horizon
+        self._check_forecast_mode()
+        self.tflite_quantization = tflite_quantization
+        self.inference_backend = inference_backend
+        self.batch_size = batch_size
+        self._check_inference_backend()
         self.model = self._build_model()
-        self.scaler = MinMaxScaler()
+        self.scaler = SeriesScaler()
 
     def _build_model(self):
         model = tf.keras.Sequential(
@@ -24,51 +38,40 @@ class CNNModel(AnalyzingModel):
                 tf.keras.layers.Dropout(0.2),
                 tf.keras.layers.Flatten(),
                 tf.keras.layers.Dense(64, activation="relu"),
-                tf.keras.layers.Dense(1),
+                tf.keras.layers.Dense(self.output_horizon),
             ]
         )
         model.compile(optimizer="adam", loss="mse")
         return model
 
-    def _preprocess(self, data):
-        sequences = []
-        for i in range(len(data) - self.window_size):
-            sequences.append(data[i : i + self.window_size])
-        return np.array(sequences)
-
-    def train(self, data):
+    def train(self, data, callbacks=None):
         scaled_data = self.scaler.fit_transform(data)
-        X = self._preprocess(scaled_data)
-        y = scaled_data[self.window_size :]
-        self.model.fit(X, y, epochs=10, batch_size=32, verbose=0)
+        self.model.fit(
+            self._training_dataset(scaled_data),
+            epochs=10,
+            callbacks=callbacks,
+            verbose=0,
+        )
         return {"status": "success", "message": "Model trained successfully"}
 
     def predict(self, data, horizon=5):
-        scaled_data = self.scaler.transform(data)
-        X = self._preprocess(scaled_data)
-        predictions = []
-
-        current_sequence = X[-1]
-        for _ in range(horizon):
-            next_pred = self.model.predict(np.expand_dims(current_sequence, axis=0))
-            predictions.append(next_pred[0, 0])
-            current_sequence = np.vstack([current_sequence[1:], next_pred])
-
-        predictions = np.array(predictions).reshape(-1, 1)
+        scaled_data = self.scaler.transform(self._prediction_tail(data))
+        predictions = self._forecast(scaled_data, horizon)
         return self.scaler.inverse_transform(predictions)
 
     def analyze(self, data):
         scaled_data = self.scaler.transform(data)
         X = self._preprocess(scaled_data)
-        predictions = self.model.predict(X)
+        return self._analysis(scaled_data, self._predict_windows(X))
 
-        mse = np.mean((predictions - scaled_data[self.window_size :]) ** 2)
-        trend = "up" if predictions[-1] > predictions[-2] else "down"
+    def _metrics(self, sums, last_predictions):
+        mse = sums["squared_error"] / sums["count"]
+        trend = "up" if last_predictions[-1] > last_predictions[-2] else "down"
 
         return {
             "mse": float(mse),
             "trend": trend,
             "last_value": float(
-                self.scaler.inverse_transform(predictions[-1].reshape(1, -1))[0, 0]
+                self.scaler.inverse_transform(last_predictions[-1].reshape(1, -1))[0, 0]
             ),
         }
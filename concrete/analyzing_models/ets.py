@@ -0,0 +1,219 @@
+import numpy as np
+from scipy.signal import lfilter, lfiltic
+from abstractions.analyzing_model import AnalyzingModel, SeriesScaler
+
+# Кандидаты периода сезонности: 1 — без сезонности (модель Холта),
+# 5 и 7 — торговая и календарная неделя дневных рядов, 24 и 168 — сутки и неделя почасовых.
+SEASON_LENGTHS = (1, 5, 7, 24, 168)
+ALPHAS = (0.05, 0.1, 0.2, 0.4, 0.6, 0.8)
+# beta и gamma задаются долями от допустимого диапазона: beta <= alpha, gamma <= 1 - alpha.
+TREND_SHARES = (0.0, 0.05, 0.2, 0.5)
+SEASON_SHARES = (0.05, 0.2, 0.5)
+
+
+def initial_states(series, season_length):
+    if len(series) < 2 * season_length:
+        raise ValueError("Not enough data to initialize exponential smoothing")
+    level = series[:season_length].mean()
+    trend = (series[season_length : 2 * season_length].mean() - level) / season_length
+    return level, trend, series[:season_length] - level
+
+
+def smoothing_filter(season_length, alpha, beta, gamma):
+    # Аддитивный Холт-Уинтерс эквивалентен ARIMA(0,1,m+1)(0,1,0)_m:
+    # (1-B)(1-B^m) y_t = theta(B) e_t, поэтому ошибки одношагового прогноза
+    # считаются одним IIR-фильтром от ряда.
+    m = season_length
+    differencing = np.zeros(m + 2)
+    np.add.at(differencing, [0, 1, m, m + 1], [1, -1, -1, 1])
+    moving_average = differencing.copy()
+    moving_average[[1, m + 1]] += [alpha + beta, -alpha - beta]
+    moving_average[2 : m + 2] += beta
+    moving_average[[m, m + 1]] += [gamma, -gamma]
+    return differencing, moving_average
+
+
+def smoothing_errors(series, season_length, alphas, betas, gammas):
+    # Ошибки для сетки параметров: первые m+1 шагов считаются явной рекурсией
+    # (по всей сетке сразу), они же задают начальное состояние фильтра для остальных.
+    alphas, betas, gammas = (np.atleast_1d(values) for values in (alphas, betas, gammas))
+    m = season_length
+    level, trend, season = initial_states(series, m)
+    level = np.full(len(alphas), level)
+    trend = np.full(len(alphas), trend)
+    season = np.tile(season, (len(alphas), 1))
+    head = min(m + 1, len(series))
+    errors = np.empty((len(alphas), len(series)))
+    for t in range(head):
+        phase = t % m
+        errors[:, t] = series[t] - level - trend - season[:, phase]
+        level = level + trend + alphas * errors[:, t]
+        trend = trend + betas * errors[:, t]
+        season[:, phase] += gammas * errors[:, t]
+    if head == len(series):
+        return errors
+    for i, (alpha, beta, gamma) in enumerate(zip(alphas, betas, gammas)):
+        differencing, moving_average = smoothing_filter(m, alpha, beta, gamma)
+        initial = lfiltic(
+            differencing, moving_average, errors[i, head - 1 :: -1], series[head - 1 :: -1]
+        )
+        errors[i, head:], _ = lfilter(
+            differencing, moving_average, series[head:], zi=initial
+        )
+    return errors
+
+
+def final_states(series, season_length, alpha, beta, gamma, errors):
+    # Состояние линейно по ошибкам, поэтому последний уровень, тренд и сезонность
+    # получаются суммами без прохода по ряду.
+    level, trend, season = initial_states(series, season_length)
+    steps = np.arange(len(series))
+    level = level + len(series) * trend + np.dot(alpha + beta * (len(series) - 1 - steps), errors)
+    season = season + gamma * np.bincount(
+        steps % season_length, weights=errors, minlength=season_length
+    )
+    return level, trend + beta * errors.sum(), season
+
+
+class ETSModel(AnalyzingModel):
+    tflite_convertible = False
+    artifact_extension = "npz"
+
+    def __init__(self, window_size=30, features=1, season_lengths=SEASON_LENGTHS):
+        self.window_size = window_size
+        self.features = features
+        self.season_lengths = tuple(season_lengths)
+        self.forecast_mode = "direct"
+        self.output_horizon = 1
+        self.season_length = None
+        self.alpha = self.beta = self.gamma = None
+        self.scaler = SeriesScaler()
+
+    def train(self, data, callbacks=None):
+        scaled_data = self.scaler.fit_transform(data)
+        self._select_parameters(scaled_data[:, 0], self.season_lengths)
+        return {"status": "success", "message": "Model trained successfully"}
+
+    def predict(self, data, horizon=5):
+        series = self.scaler.transform(data)[:, 0]
+        forecast = self._extrapolate(series, self._errors(series), horizon)
+        return self.scaler.inverse_transform(forecast)
+
+    def predict_origins(self, data, origins, horizon=5):
+        # Ошибки сглаживания причинны: один проход фильтра по ряду даёт
+        # состояния для всех точек отсечения.
+        series = self.scaler.transform(data)[:, 0]
+        errors = self._errors(series)
+        forecasts = np.stack(
+            [self._extrapolate(series[:origin], errors[:origin], horizon) for origin in origins]
+        )
+        return self.scaler.inverse_transform(forecasts.reshape(-1, 1)).reshape(forecasts.shape)
+
+    def analyze(self, data):
+        scaled_data = self.scaler.transform(data)
+        errors = self._errors(scaled_data[:, 0])
+        return self._analysis(scaled_data, self._fitted(scaled_data, errors))
+
+    def _metrics(self, sums, last_predictions):
+        mse = sums["squared_error"] / sums["count"]
+        trend = "up" if last_predictions[-1] > last_predictions[-2] else "down"
+
+        return {
+            "mse": float(mse),
+            "trend": trend,
+            "last_value": float(
+                self.scaler.inverse_transform(last_predictions[-1].reshape(1, -1))[0, 0]
+            ),
+        }
+
+    def _select_parameters(self, series, season_lengths):
+        # Перебор сетки параметров по MSE одношагового прогноза на общем для всех
+        # периодов участке ряда, после инициализации самого длинного из них.
+        candidates = [m for m in season_lengths if len(series) >= 4 * m]
+        if not candidates:
+            raise ValueError("Not enough data to fit exponential smoothing")
+        start = 2 * max(candidates)
+        best = None
+        for m in candidates:
+            grid = np.array(
+                [
+                    (alpha, alpha * trend_share, (1 - alpha) * season_share)
+                    for alpha in ALPHAS
+                    for trend_share in TREND_SHARES
+                    for season_share in (SEASON_SHARES if m > 1 else (0.0,))
+                ]
+            )
+            with np.errstate(all="ignore"):
+                errors = smoothing_errors(series, m, *grid.T)
+                scores = np.mean(errors[:, start:] ** 2, axis=1)
+            scores[~np.isfinite(scores)] = np.inf
+            index = int(np.argmin(scores))
+            if best is None or scores[index] < best[0]:
+                best = (scores[index], m, *grid[index])
+        _, self.season_length, self.alpha, self.beta, self.gamma = best
+        self.season_length = int(self.season_length)
+        self.alpha, self.beta, self.gamma = map(float, (self.alpha, self.beta, self.gamma))
+
+    def _errors(self, series):
+        return smoothing_errors(
+            series, self.season_length, self.alpha, self.beta, self.gamma
+        )[0]
+
+    def _fitted(self, scaled_data, errors):
+        return (scaled_data[:, 0] - errors)[self.window_size :].reshape(-1, 1)
+
+    def _in_sample(self, data, start):
+        # Ошибки сглаживания зависят от всего ряда, поэтому фильтр проходит его целиком;
+        # он дешевле инференса и не требует хранить состояние между запусками.
+        scaled_data = self.scaler.transform(data)
+        predictions = self._fitted(scaled_data, self._errors(scaled_data[:, 0]))
+        return scaled_data[start:], predictions[start - self.window_size :]
+
+    def _extrapolate(self, series, errors, horizon):
+        level, trend, season = final_states(
+            series, self.season_length, self.alpha, self.beta, self.gamma, errors
+        )
+        steps = np.arange(1, horizon + 1)
+        phases = (len(series) + steps - 1) % self.season_length
+        return (level + steps * trend + season[phases]).reshape(-1, 1)
+
+    @property
+    def predict_lookback(self):
+        # Состояние сглаживания накапливается с начала ряда, хвоста недостаточно.
+        return None
+
+    @property
+    def fine_tune_lookback(self):
+        return None
+
+    def _fit_increment(self, scaled_data, epochs, callbacks, timestamps=None):
+        # Параметры, подобранные по короткому хвосту, шумят; перебор по всей
+        # истории стоит доли секунды, поэтому дообучение — это полный подбор.
+        self._select_parameters(scaled_data[:, 0], self.season_lengths)
+
+    def build_inference(self):
+        pass
+
+    def warm_up(self, batch_sizes=None):
+        # Компилировать нечего: фильтр и прогноз считаются в NumPy/SciPy.
+        return {}
+
+    def memory_footprint(self):
+        return 8 * (4 + (self.season_length or 0))
+
+    def _config(self):
+        config = super()._config()
+        config["season_lengths"] = list(self.season_lengths)
+        return config
+
+    def _save_model(self, path, model_type):
+        np.savez(
+            f"{path}/{model_type}_model.npz",
+            season_length=self.season_length,
+            smoothing=[self.alpha, self.beta, self.gamma],
+        )
+
+    def _load_model(self, path, model_type):
+        with np.load(f"{path}/{model_type}_model.npz") as artifact:
+            self.season_length = int(artifact["season_length"])
+            self.alpha, self.beta, self.gamma = map(float, artifact["smoothing"])
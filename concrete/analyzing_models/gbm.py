@@ -0,0 +1,179 @@
+import lightgbm as lgb
+import numpy as np
+from abstractions.analyzing_model import AnalyzingModel, SeriesScaler
+
+ROLLING_WINDOWS = (7, 24)
+BOOSTING_PARAMETERS = {
+    "objective": "regression",
+    "learning_rate": 0.05,
+    "num_leaves": 31,
+    "min_data_in_leaf": 20,
+    "feature_fraction": 0.9,
+    "verbose": -1,
+}
+
+
+def calendar_features(timestamps):
+    timestamps = np.asarray(timestamps, dtype="datetime64[ns]")
+    days = timestamps.astype("datetime64[D]")
+    hour = (timestamps - days).astype("timedelta64[h]").astype(np.int64)
+    # 1970-01-01 — четверг, сдвиг на 3 даёт понедельник = 0, как в pandas.
+    day_of_week = (days.astype(np.int64) + 3) % 7
+    month = timestamps.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    return np.column_stack([hour, day_of_week, month])
+
+
+def window_features(windows, timestamps=None):
+    # Признаки считаются относительно последнего значения окна, чтобы деревья
+    # не упирались в диапазон уровней обучающей выборки на трендовых рядах.
+    windows = windows[:, :, 0]
+    last = windows[:, -1:]
+    columns = [windows[:, :-1] - last]
+    for size in ROLLING_WINDOWS + (windows.shape[1],):
+        if size <= windows.shape[1]:
+            tail = windows[:, -size:]
+            columns += [tail.mean(axis=1, keepdims=True) - last, tail.std(axis=1, keepdims=True)]
+    if timestamps is not None:
+        columns.append(calendar_features(timestamps))
+    return np.hstack(columns)
+
+
+class GBMModel(AnalyzingModel):
+    tflite_convertible = False
+    artifact_extension = "txt"
+    uses_calendar = True
+
+    def __init__(self, window_size=30, features=1, n_jobs=None, boosting_rounds=300):
+        self.window_size = window_size
+        self.features = features
+        self.n_jobs = n_jobs
+        self.boosting_rounds = boosting_rounds
+        self.forecast_mode = "recursive"
+        self.output_horizon = 1
+        self.calendar = False
+        self.model = None
+        self.scaler = SeriesScaler()
+
+    def train(self, data, callbacks=None, timestamps=None):
+        scaled_data = self.scaler.fit_transform(data)
+        self.calendar = timestamps is not None
+        self._fit(scaled_data, timestamps)
+        return {"status": "success", "message": "Model trained successfully"}
+
+    def _fit(self, scaled_data, timestamps):
+        features, targets = self._training_set(scaled_data, timestamps)
+        self.model = lgb.train(
+            {**BOOSTING_PARAMETERS, "num_threads": self.n_jobs or 0},
+            lgb.Dataset(features, targets),
+            num_boost_round=self.boosting_rounds,
+        )
+
+    def predict(self, data, horizon=5, timestamps=None):
+        data = self._prediction_tail(data)
+        if timestamps is not None:
+            timestamps = timestamps[-len(data) :]
+        scaled_data = self.scaler.transform(data)
+        predictions = self._forecast(scaled_data, horizon, timestamps)
+        return self.scaler.inverse_transform(predictions)
+
+    def analyze(self, data, timestamps=None):
+        scaled_data = self.scaler.transform(data)
+        return self._analysis(scaled_data, self._fitted(scaled_data, timestamps))
+
+    def _metrics(self, sums, last_predictions):
+        mse = sums["squared_error"] / sums["count"]
+        trend = "up" if last_predictions[-1] > last_predictions[-2] else "down"
+
+        return {
+            "mse": float(mse),
+            "trend": trend,
+            "last_value": float(
+                self.scaler.inverse_transform(last_predictions[-1].reshape(1, -1))[0, 0]
+            ),
+        }
+
+    def _target_timestamps(self, timestamps):
+        if not self.calendar:
+            return None
+        if timestamps is None:
+            raise ValueError("Model was trained with calendar features, timestamps are required")
+        return np.asarray(timestamps, dtype="datetime64[ns]")
+
+    def _training_set(self, scaled_data, timestamps):
+        windows = self._preprocess(scaled_data)
+        timestamps = self._target_timestamps(timestamps)
+        if timestamps is not None:
+            timestamps = timestamps[self.window_size :]
+        targets = scaled_data[self.window_size :, 0] - windows[:, -1, 0]
+        return window_features(windows, timestamps), targets
+
+    def _fitted(self, scaled_data, timestamps):
+        features, _ = self._training_set(scaled_data, timestamps)
+        windows = self._preprocess(scaled_data)
+        return (windows[:, -1, 0] + self.model.predict(features)).reshape(-1, 1)
+
+    def _in_sample(self, data, start, timestamps=None):
+        offset = start - self.window_size
+        scaled_data = self.scaler.transform(data[offset:])
+        if timestamps is not None:
+            timestamps = timestamps[offset:]
+        return scaled_data[self.window_size :], self._fitted(scaled_data, timestamps)
+
+    def predict_origins(self, data, origins, horizon=5, timestamps=None):
+        windows = self._origin_windows(self.scaler.transform(data), origins)
+        timestamps = self._target_timestamps(timestamps)
+        if timestamps is not None:
+            timestamps = self._origin_windows(timestamps, origins)
+        forecasts = self._forecast_windows(windows, horizon, timestamps)
+        return self.scaler.inverse_transform(forecasts.reshape(-1, 1)).reshape(forecasts.shape)
+
+    def _forecast(self, scaled_data, horizon, timestamps=None):
+        timestamps = self._target_timestamps(timestamps)
+        if timestamps is not None:
+            timestamps = timestamps[np.newaxis, -self.window_size :]
+        windows = scaled_data[np.newaxis, -self.window_size :]
+        return self._forecast_windows(windows, horizon, timestamps)[0]
+
+    def _forecast_windows(self, windows, horizon, window_timestamps=None):
+        # Метки шагов прогноза продолжают метки каждого окна с его медианным шагом.
+        targets = None
+        if window_timestamps is not None:
+            steps = np.diff(window_timestamps, axis=1).astype(np.int64)
+            step = np.median(steps, axis=1).astype("timedelta64[ns]")
+            targets = window_timestamps[:, -1:] + step[:, None] * np.arange(1, horizon + 1)
+        windows = np.array(windows)
+        predictions = np.empty((len(windows), horizon))
+        for step in range(horizon):
+            features = window_features(windows, None if targets is None else targets[:, step])
+            predictions[:, step] = windows[:, -1, 0] + self.model.predict(features, num_threads=1)
+            windows = np.concatenate([windows[:, 1:], predictions[:, step, None, None]], axis=1)
+        return predictions[:, :, np.newaxis]
+
+    @property
+    def fine_tune_lookback(self):
+        return None
+
+    def _fit_increment(self, scaled_data, epochs, callbacks, timestamps=None):
+        # refit по нескольким новым точкам стягивает к нулю листья, до которых они
+        # не доходят, поэтому бустинг обучается заново по всей истории (около секунды).
+        self._fit(scaled_data, timestamps)
+
+    def build_inference(self):
+        pass
+
+    def warm_up(self, batch_sizes=None):
+        return {}
+
+    def memory_footprint(self):
+        return len(self.model.model_to_string()) if self.model is not None else 0
+
+    def _config(self):
+        config = super()._config()
+        config["calendar"] = self.calendar
+        return config
+
+    def _save_model(self, path, model_type):
+        self.model.save_model(f"{path}/{model_type}_model.txt")
+
+    def _load_model(self, path, model_type):
+        self.model = lgb.Booster(model_file=f"{path}/{model_type}_model.txt")
@@ -1,16 +1,57 @@
 import tensorflow as tf
 import numpy as np
-from abstractions.analyzing_model import AnalyzingModel
-from sklearn.preprocessing import MinMaxScaler
+from abstractions.analyzing_model import AnalyzingModel, SeriesScaler
+
+
+@tf.keras.utils.register_keras_serializable(package="analyzer")
+class PinballLoss(tf.keras.losses.Loss):
+    # Квантильная потеря для выхода из блоков по output_horizon шагов на каждый квантиль.
+    def __init__(self, quantiles, output_horizon, name="pinball_loss", **kwargs):
+        super().__init__(name=name, **kwargs)
+        self.quantiles = list(quantiles)
+        self.output_horizon = output_horizon
+
+    def call(self, y_true, y_pred):
+        y_pred = tf.reshape(y_pred, (-1, len(self.quantiles), self.output_horizon))
+        errors = tf.expand_dims(tf.cast(y_true, y_pred.dtype), 1) - y_pred
+        levels = tf.constant(self.quantiles, dtype=y_pred.dtype)[None, :, None]
+        return tf.reduce_mean(tf.maximum(levels * errors, (levels - 1) * errors), axis=[1, 2])
+
+    def get_config(self):
+        config = super().get_config()
+        config.update(quantiles=self.quantiles, output_horizon=self.output_horizon)
+        return config
 
 
 class TFTModel(AnalyzingModel):
-    def __init__(self, window_size=30, features=1, num_heads=4):
+    def __init__(
+        self,
+        window_size=30,
+        features=1,
+        num_heads=4,
+        forecast_mode="recursive",
+        output_horizon=1,
+        tflite_quantization=None,
+        inference_backend="keras",
+        batch_size=32,
+        quantiles=None,
+    ):
         self.window_size = window_size
         self.features = features
         self.num_heads = num_heads
+        self.forecast_mode = forecast_mode
+        self.output_horizon = output_horizon
+        self._check_forecast_mode()
+        if quantiles:
+            if 0.5 not in quantiles:
+                raise ValueError("Quantiles must include the median 0.5")
+            self.quantiles = sorted(quantiles, key=lambda level: level != 0.5)
+        self.tflite_quantization = tflite_quantization
+        self.inference_backend = inference_backend
+        self.batch_size = batch_size
+        self._check_inference_backend()
         self.model = self._build_model()
-        self.scaler = MinMaxScaler()
+        self.scaler = SeriesScaler()
 
     def _build_model(self):
         inputs = tf.keras.layers.Input(shape=(self.window_size, self.features))
@@ -30,13 +71,30 @@ class TFTModel(AnalyzingModel):
         x = tf.keras.layers.LayerNormalization()(x)
 
         x = tf.keras.layers.GlobalAveragePooling1D()(x)
-        outputs = tf.keras.layers.Dense(1)(x)
+        outputs = tf.keras.layers.Dense(
+            self.output_horizon * len(self.quantiles or [0.5])
+        )(x)
 
         model = tf.keras.Model(inputs=inputs, outputs=outputs)
-        model.compile(optimizer="adam", loss="mse")
+        if self.quantiles:
+            loss = PinballLoss(self.quantiles, self.output_horizon)
+        else:
+            loss = "mse"
+        model.compile(optimizer="adam", loss=loss)
 
         return model
 
+    def _config(self):
+        config = super()._config()
+        config["num_heads"] = self.num_heads
+        config["quantiles"] = self.quantiles
+        return config
+
+    def _load_model(self, path, model_type):
+        super()._load_model(path, model_type)
+        # В артефактах без квантилей конфиг не содержит списка, и модель точечная.
+        self.quantiles = None
+
     def _positional_encoding(self, length, depth):
         positions = np.arange(length)[:, np.newaxis]
         depths = np.arange(depth)[np.newaxis, :] / depth
@@ -59,51 +117,38 @@ class TFTModel(AnalyzingModel):
         )
         return ffn(x)
 
-    def _preprocess(self, data):
-        sequences = []
-        for i in range(len(data) - self.window_size):
-            sequences.append(data[i : i + self.window_size])
-        return np.array(sequences)
-
-    def train(self, data):
+    def train(self, data, callbacks=None):
         scaled_data = self.scaler.fit_transform(data)
-        X = self._preprocess(scaled_data)
-        y = scaled_data[self.window_size :]
 
         early_stopping = tf.keras.callbacks.EarlyStopping(
             monitor="loss", patience=5, restore_best_weights=True
         )
 
         self.model.fit(
-            X, y, epochs=20, batch_size=32, callbacks=[early_stopping], verbose=0
+            self._training_dataset(scaled_data),
+            epochs=20,
+            callbacks=[early_stopping] + (callbacks or []),
+            verbose=0,
         )
         return {"status": "success", "message": "Model trained successfully"}
 
     def predict(self, data, horizon=5):
-        scaled_data = self.scaler.transform(data)
-        X = self._preprocess(scaled_data)
-        predictions = []
-
-        current_sequence = X[-1]
-        for _ in range(horizon):
-            next_pred = self.model.predict(np.expand_dims(current_sequence, axis=0))
-            predictions.append(next_pred[0, 0])
-            current_sequence = np.vstack([current_sequence[1:], next_pred])
-
-        predictions = np.array(predictions).reshape(-1, 1)
-        return self.scaler.inverse_transform(predictions)
+        scaled_data = self.scaler.transform(self._prediction_tail(data))
+        predictions = self._forecast(scaled_data, horizon)
+        return self._inverse_transform(predictions)
 
     def analyze(self, data):
         scaled_data = self.scaler.transform(data)
         X = self._preprocess(scaled_data)
-        predictions = self.model.predict(X)
+        return self._analysis(scaled_data, self._predict_windows(X))
 
-        mse = np.mean((predictions - scaled_data[self.window_size :]) ** 2)
+    def _metrics(self, sums, last_predictions):
+        mse = sums["squared_error"] / sums["count"]
         rmse = np.sqrt(mse)
-        mae = np.mean(np.abs(predictions - scaled_data[self.window_size :]))
+        mae = sums["absolute_error"] / sums["count"]
 
-        if len(predictions) >= 2:
-            trend = "up" if predictions[-1] > predictions[-2] else "down"
+        if len(last_predictions) >= 2:
+            trend = "up" if last_predictions[-1] > last_predictions[-2] else "down"
         else:
             trend = "unknown"
 
@@ -113,6 +158,6 @@ class TFTModel(AnalyzingModel):
             "mae": float(mae),
             "trend": trend,
             "last_value": float(
-                self.scaler.inverse_transform(predictions[-1].reshape(1, -1))[0, 0]
+                self.scaler.inverse_transform(last_predictions[-1].reshape(1, -1))[0, 0]
             ),
         }
@@ -1,6 +1,5 @@
 from abstractions.data_fetcher import DataFetcher
 from domain_objects.action import Action
-import httpx
 from logger import Logger
 
 
@@ -9,14 +8,13 @@ class ActionFetcher(DataFetcher[Action]):
         "https://iss.moex.com/iss/history/engines/stock/markets/shares/boards/TQBR/securities/"
     )
 
-    def __init__(self):
+    def __init__(self, **client_options):
+        super().__init__(**client_options)
         self._logger = Logger("ActionFetcher")
 
     async def _get_raw_data(self) -> dict:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.get_url())
-            response.raise_for_status()
-            self._logger.debug(f"Response status code: {response.status_code}")
+        response = await self._get(self.get_url())
+        self._logger.debug(f"Response status code: {response.status_code}")
 
         data = response.json()
         if not data:
@@ -1,19 +1,17 @@
 from abstractions.data_fetcher import DataFetcher
 from domain_objects.electricity_record import ElectricityRecord
-import httpx
 from logger import Logger
 
 
 class ElectricityFetcher(DataFetcher[ElectricityRecord]):
     _url: str = "https://www.elprisetjustnu.se/api/v1/prices/"
 
-    def __init__(self):
+    def __init__(self, **client_options):
+        super().__init__(**client_options)
         self._logger = Logger("ElectricityFetcher")
 
     async def _get_raw_data(self) -> dict:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.get_url())
-            response.raise_for_status()
+        response = await self._get(self.get_url())
 
         data = response.json()
         if not data:
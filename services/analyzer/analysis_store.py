@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import threading
+from typing import TYPE_CHECKING, Dict, Optional
+import numpy as np
+from logger import Logger
+from model_registry import ModelKey
+
+if TYPE_CHECKING:
+    from abstractions.analyzing_model import AnalyzingModel
+
+
+def scaler_state(model: "AnalyzingModel") -> list:
+    return [model.scaler.min_.tolist(), model.scaler.scale_.tolist()]
+
+
+def history_fingerprint(target: np.ndarray) -> str:
+    return hashlib.blake2b(
+        np.ascontiguousarray(target).tobytes(), digest_size=16
+    ).hexdigest()
+
+
+class AnalysisStore:
+    # Для каждого ряда хранится состояние анализа текущей версии модели: суммы остатков,
+    # последние предсказания и отпечаток проанализированной истории. In-sample предсказания
+    # дописываются в бинарный файл рядом, поэтому запись растёт вместе с приростом ряда.
+    # Новая версия с тем же масштабированием (например, после дообучения) продолжает
+    # состояние: уже проанализированные точки остаются с предсказаниями прежней версии.
+    _directory: str
+    _states: Dict[ModelKey, dict]
+    _logger: Logger
+
+    def __init__(self, directory: str):
+        self._directory = directory
+        self._states = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.full_runs = 0
+        self.incremental_runs = 0
+        self.analyzed_points = 0
+        self._logger = Logger("AnalysisStore")
+
+    def state_path(self, key: ModelKey) -> str:
+        domain, ticker, model_type, window_size = key
+        return f"{self._directory}/{domain}/{ticker}/{model_type}_{window_size}.json"
+
+    def predictions_path(self, key: ModelKey) -> str:
+        return self.state_path(key)[: -len(".json")] + ".predictions"
+
+    def analyze(
+        self, key: ModelKey, model: "AnalyzingModel", target: np.ndarray, **inputs
+    ) -> dict:
+        with self._key_lock(key):
+            state = self._state(key)
+            if state is not None and not self._continues(state, model, target):
+                self._logger.info(f"History or scaling of {key} changed, analyzing from scratch")
+                self._discard(key)
+                state = None
+            rebased = state is not None and state["version"] != model.version
+            if rebased:
+                self._logger.info(f"Continuing analysis of {key} with version {model.version}")
+            analysis, model_state, predictions = model.analyze_increment(
+                target, state["model_state"] if state is not None else None, **inputs
+            )
+            new_points = len(predictions)
+            if state is None:
+                self.full_runs += 1
+            else:
+                self.incremental_runs += 1
+            self.analyzed_points += new_points
+            if new_points or state is None or rebased:
+                self._append_predictions(key, model.scaler.inverse_transform(predictions))
+                self._save(
+                    key,
+                    {
+                        "version": model.version,
+                        "scaler": scaler_state(model),
+                        "fingerprint": history_fingerprint(target),
+                        "predictions": model_state["points"] - model.window_size,
+                        "model_state": model_state,
+                    },
+                )
+            self._logger.debug(f"Analyzed {new_points} new points of {key}")
+            return analysis
+
+    def predictions(self, key: ModelKey) -> Optional[np.ndarray]:
+        with self._key_lock(key):
+            state = self._state(key)
+            if state is None:
+                return None
+            return np.fromfile(self.predictions_path(key))[: state["predictions"]]
+
+    def stats(self) -> dict:
+        return {
+            "series": len(self._states),
+            "full_runs": self.full_runs,
+            "incremental_runs": self.incremental_runs,
+            "analyzed_points": self.analyzed_points,
+        }
+
+    @staticmethod
+    def _continues(state: dict, model: "AnalyzingModel", target: np.ndarray) -> bool:
+        points = state["model_state"]["points"]
+        return (
+            (state["version"] == model.version or state.get("scaler") == scaler_state(model))
+            and points <= len(target)
+            and state["fingerprint"] == history_fingerprint(target[:points])
+        )
+
+    def _key_lock(self, key: ModelKey) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _state(self, key: ModelKey) -> Optional[dict]:
+        with self._lock:
+            state = self._states.get(key)
+        if state is not None:
+            return state
+        path = self.state_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            state = json.load(f)
+        with self._lock:
+            self._states[key] = state
+        return state
+
+    def _append_predictions(self, key: ModelKey, predictions: np.ndarray):
+        # Хвост после сбоя между дозаписью и сохранением состояния отрезается.
+        path = self.predictions_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        state = self._state(key)
+        stored = state["predictions"] if state is not None else 0
+        with open(path, "ab") as f:
+            f.truncate(stored * 8)
+            f.write(np.ascontiguousarray(predictions[:, 0], dtype=np.float64).tobytes())
+
+    def _save(self, key: ModelKey, state: dict):
+        path = self.state_path(key)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(f"{path}.tmp", path)
+        with self._lock:
+            self._states[key] = state
+
+    def _discard(self, key: ModelKey):
+        for path in (self.state_path(key), self.predictions_path(key)):
+            if os.path.exists(path):
+                os.remove(path)
+        with self._lock:
+            self._states.pop(key, None)
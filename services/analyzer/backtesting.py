@@ -0,0 +1,200 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import json
+import multiprocessing
+import os
+import threading
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+from logger import Logger
+from model_registry import ModelKey
+from training_jobs import configure_training_threads
+
+
+def rolling_origins(length: int, initial_size: int, step: int, horizon: int) -> List[int]:
+    return list(range(initial_size, length - horizon + 1, step))
+
+
+def forecast_errors(actual: np.ndarray, forecast: np.ndarray) -> dict:
+    errors = forecast - actual
+    nonzero = actual != 0
+    return {
+        "mae": float(np.mean(np.abs(errors))),
+        "rmse": float(np.sqrt(np.mean(errors**2))),
+        "mape": float(np.mean(np.abs(errors[nonzero] / actual[nonzero])) * 100)
+        if nonzero.any()
+        else None,
+    }
+
+
+def run_segment(
+    model_class,
+    model_parameters: dict,
+    values: np.ndarray,
+    timestamps: np.ndarray,
+    origins: List[int],
+    horizon: int,
+) -> List[dict]:
+    # Модель обучается один раз в начале сегмента и прогнозирует со всех его
+    # точек отсечения, пока не наступит следующее переобучение. Фолды сегмента
+    # делят окна одного ряда и считаются одним вызовом predict_origins.
+    fit_origin = origins[0]
+
+    def inputs(end):
+        if model_class.uses_calendar and timestamps is not None:
+            return {"timestamps": timestamps[:end]}
+        return {}
+
+    model = model_class(**model_parameters)
+    model.train(values[:fit_origin], **inputs(fit_origin))
+    forecasts = model.predict_origins(
+        values, origins, horizon=horizon, **inputs(len(values))
+    )
+    return [
+        {
+            "origin": origin,
+            "fit_origin": fit_origin,
+            **forecast_errors(values[origin : origin + horizon, 0], forecast[:, 0]),
+        }
+        for origin, forecast in zip(origins, forecasts)
+    ]
+
+
+class Backtester:
+    _results_dir: str
+    _model_spec: Callable[[str, int], Tuple[type, dict]]
+    _max_workers: int
+    _logger: Logger
+
+    def __init__(
+        self,
+        results_dir: str,
+        model_spec: Callable[[str, int], Tuple[type, dict]],
+        max_workers: int = None,
+        refit_every: int = 5,
+    ):
+        self._results_dir = results_dir
+        self._model_spec = model_spec
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._refit_every = refit_every
+        self._lock = threading.Lock()
+        self._logger = Logger("Backtester")
+
+    def results_path(self, key: ModelKey, grid: Tuple[int, int, int]) -> str:
+        # Сетка точек отсечения (горизонт, шаг, начальный размер) входит в имя файла:
+        # фолды разных сеток не смешиваются.
+        domain, ticker, model_type, window_size = key
+        horizon, step, initial_size = grid
+        return (
+            f"{self._results_dir}/{domain}/{ticker}/{model_type}_{window_size}"
+            f"_h{horizon}_s{step}_i{initial_size}_r{self._refit_every}.json"
+        )
+
+    def load_folds(self, key: ModelKey, grid: Tuple[int, int, int]) -> Dict[str, dict]:
+        path = self.results_path(key, grid)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)["folds"]
+
+    def _save_folds(self, key: ModelKey, grid: Tuple[int, int, int], folds: Dict[str, dict]):
+        path = self.results_path(key, grid)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump({"folds": folds}, f)
+        os.replace(f"{path}.tmp", path)
+
+    def run(
+        self,
+        keys: List[ModelKey],
+        series: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]],
+        horizon: int,
+        step: int,
+        initial_size: int,
+    ) -> Dict[ModelKey, dict]:
+        # Фолды всех моделей и тикеров идут в один пул процессов; уже посчитанные
+        # точки отсечения (по метке времени) берутся из сохранённых результатов.
+        # Начальный размер задаётся явно: иначе сетка сдвигалась бы с ростом ряда.
+        grid = (horizon, step, initial_size)
+        with self._lock:
+            stored = {key: self.load_folds(key, grid) for key in keys}
+            labels = {
+                name: self._labels(timestamps, len(values))
+                for name, (timestamps, values) in series.items()
+            }
+            segments = []
+            requested = {}
+            for key in keys:
+                _, values = series[key[:2]]
+                origins = rolling_origins(len(values), initial_size, step, horizon)
+                requested[key] = [labels[key[:2]][origin] for origin in origins]
+                pending = [
+                    origin for origin in origins if labels[key[:2]][origin] not in stored[key]
+                ]
+                for start in range(0, len(pending), self._refit_every):
+                    segments.append((key, pending[start : start + self._refit_every]))
+            self._logger.info(
+                f"Backtesting {len(keys)} models: {len(segments)} segments to compute"
+            )
+            computed = {key: 0 for key in keys}
+            if segments:
+                self._compute(segments, series, labels, grid, stored, computed)
+            # Сводка — только по точкам отсечения этого запроса, а не по всему файлу.
+            return {
+                key: self._summary(
+                    [stored[key][label] for label in requested[key] if label in stored[key]],
+                    computed[key],
+                )
+                for key in keys
+            }
+
+    def _compute(self, segments, series, labels, grid, stored, computed):
+        horizon = grid[0]
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=min(self._max_workers, len(segments)),
+            mp_context=context,
+            initializer=configure_training_threads,
+            initargs=(1, 1),
+        ) as executor:
+            futures = {}
+            for key, origins in segments:
+                domain, ticker, model_type, window_size = key
+                model_class, model_parameters = self._model_spec(model_type, window_size)
+                timestamps, values = series[(domain, ticker)]
+                end = origins[-1] + horizon
+                future = executor.submit(
+                    run_segment,
+                    model_class,
+                    model_parameters,
+                    values[:end],
+                    None if timestamps is None else timestamps[:end],
+                    origins,
+                    horizon,
+                )
+                futures[future] = key
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    folds = future.result()
+                except Exception as e:
+                    self._logger.error(f"Backtest segment of {key} failed: {e}")
+                    continue
+                for fold in folds:
+                    fold["fit_origin"] = labels[key[:2]][fold["fit_origin"]]
+                    stored[key][labels[key[:2]][fold.pop("origin")]] = fold
+                computed[key] += len(folds)
+                self._save_folds(key, grid, stored[key])
+
+    @staticmethod
+    def _labels(timestamps, length):
+        if timestamps is None:
+            return [str(index) for index in range(length)]
+        return [str(timestamp) for timestamp in timestamps.astype("datetime64[s]")]
+
+    @staticmethod
+    def _summary(folds: List[dict], computed: int) -> dict:
+        summary = {"folds": len(folds), "computed_folds": computed}
+        for metric in ("mae", "rmse", "mape"):
+            values = [fold[metric] for fold in folds if fold[metric] is not None]
+            summary[metric] = float(np.mean(values)) if values else None
+        return summary
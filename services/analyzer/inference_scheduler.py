@@ -0,0 +1,111 @@
+from concurrent.futures import Future
+import queue
+import threading
+import time
+from typing import TYPE_CHECKING, Dict
+import numpy as np
+from logger import Logger
+
+if TYPE_CHECKING:
+    from abstractions.analyzing_model import AnalyzingModel
+
+
+class InferenceScheduler:
+    # Окна одновременных запросов к одной модели собираются в один батч:
+    # воркер модели ждёт не дольше max_wait_ms и не набирает больше max_batch окон.
+    _max_batch: int
+    _max_wait: float
+    _queues: Dict[int, queue.Queue]
+    _logger: Logger
+
+    def __init__(self, max_batch: int = 256, max_wait_ms: float = 2.0, idle_seconds: float = 30.0):
+        self._max_batch = max_batch
+        self._max_wait = max_wait_ms / 1000
+        self._idle_seconds = idle_seconds
+        self._queues = {}
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self._logger = Logger("InferenceScheduler")
+
+    def infer(self, model: "AnalyzingModel", windows: np.ndarray) -> np.ndarray:
+        done = Future()
+        with self._lock:
+            requests = self._queues.get(id(model))
+            if requests is None:
+                requests = self._queues[id(model)] = queue.Queue()
+                threading.Thread(
+                    target=self._serve,
+                    args=(model, requests),
+                    name=f"inference-{type(model).__name__}",
+                    daemon=True,
+                ).start()
+            requests.put((windows, done))
+        return done.result()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_requests": self.requests / self.batches if self.batches else None,
+            "active_models": len(self._queues),
+        }
+
+    def _serve(self, model: "AnalyzingModel", requests: queue.Queue):
+        concurrent = False
+        pending = None
+        while True:
+            try:
+                first = pending or requests.get(timeout=self._idle_seconds)
+            except queue.Empty:
+                with self._lock:
+                    # Воркер простаивающей (например, выгруженной) модели завершается.
+                    if requests.empty():
+                        del self._queues[id(model)]
+                        return
+                continue
+            batch = [first]
+            size = len(first[0])
+            pending = None
+            # Ждать остальных имеет смысл только под нагрузкой: одиночный запрос
+            # уходит сразу, а уже стоящие в очереди забираются без ожидания.
+            deadline = time.monotonic() + (self._max_wait if concurrent else 0)
+            while size < self._max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = requests.get(timeout=remaining)
+                    else:
+                        item = requests.get_nowait()
+                except queue.Empty:
+                    break
+                # Запрос, с которым батч превысил бы max_batch, открывает следующий батч:
+                # иначе дополнение вывело бы форму за пределы прогретых.
+                if size + len(item[0]) > self._max_batch:
+                    pending = item
+                    break
+                batch.append(item)
+                size += len(item[0])
+            concurrent = len(batch) > 1
+            self._run(model, batch)
+
+    def _run(self, model: "AnalyzingModel", batch):
+        try:
+            windows = np.concatenate([windows for windows, _ in batch])
+            # Дополнение до степени двойки держит набор форм входа, под которые компилируется XLA.
+            padded_size = 1 << (len(windows) - 1).bit_length()
+            if padded_size != len(windows):
+                padding = np.repeat(windows[-1:], padded_size - len(windows), axis=0)
+                windows = np.concatenate([windows, padding])
+            outputs = model._forward(windows)
+        except Exception as e:
+            for _, done in batch:
+                done.set_exception(e)
+            return
+        with self._lock:
+            self.batches += 1
+            self.requests += len(batch)
+        offset = 0
+        for windows, done in batch:
+            done.set_result(outputs[offset : offset + len(windows)])
+            offset += len(windows)
@@ -1,66 +1,286 @@
+from analysis_store import AnalysisStore
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 import httpx
+from inference_scheduler import InferenceScheduler
 from logger import Logger
-from concrete.analyzing_models.cnn import CNNModel
-from concrete.analyzing_models.rnn import RNNModel
-from concrete.analyzing_models.tft import TFTModel
+from backtesting import Backtester
+from model_registry import ModelRegistry
+from prewarm import Prewarmer
+from result_cache import ResultCache
+from series_reader import IDENTIFIER, SeriesReader, ServiceSeriesReader
+from training_jobs import TrainingJobManager
+from typing import TYPE_CHECKING
+import asyncio
+import importlib
 import pandas as pd
 import numpy as np
 import os
+import threading
+
+if TYPE_CHECKING:
+    from abstractions.analyzing_model import AnalyzingModel
 
 analyzer = FastAPI()
 logger = Logger("analyzer")
 
-models = {
-    "cnn": CNNModel(window_size=30, features=1),
-    "rnn": RNNModel(window_size=30, features=1),
-    "tft": TFTModel(window_size=30, features=1),
-}
-
 MODELS_DIR = "saved_models"
 os.makedirs(MODELS_DIR, exist_ok=True)
+DEFAULT_WINDOW_SIZE = 30
+FORECAST_HORIZON = 30
+ELECTRICITY_REGION = "SE3"
+TARGET_COLUMNS = {"finance": "close", "electricity": "price"}
+FORECAST_FREQUENCIES = {"finance": "D", "electricity": "h"}
+SERIES_SOURCES = {
+    "finance": {
+        "host": "finance_db",
+        "port": 5432,
+        "database": "finance_db",
+        "user": "user",
+        "password": "secret",
+        "column": "close",
+    },
+    "electricity": {
+        "host": "electricity_db",
+        "port": 5432,
+        "database": "electricity_db",
+        "user": "user",
+        "password": "secret",
+        "column": "price",
+        "table": "electricity",
+    },
+}
+SERIES_SERVICES = {
+    "finance": {"url": "http://finance:8005/get_data", "column": "close"},
+    "electricity": {"url": "http://electricity:8007/get_data", "column": "price"},
+}
+# TFLITE_QUANTIZATION: none | dynamic | float16; без значения TFLite не экспортируется.
+TFLITE_QUANTIZATION = os.environ.get("TFLITE_QUANTIZATION") or None
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "keras")
+# TFT_QUANTILES: уровни квантильных голов TFT; пустое значение — точечный прогноз по MSE.
+TFT_QUANTILES = [
+    float(level)
+    for level in os.environ.get("TFT_QUANTILES", "0.1,0.5,0.9").split(",")
+    if level
+]
+
+# Классы моделей (и вместе с ними TensorFlow) импортируются при первом обращении,
+# чтобы сервис начинал принимать запросы сразу после старта.
+MODEL_CLASSES = {
+    "cnn": "concrete.analyzing_models.cnn.CNNModel",
+    "rnn": "concrete.analyzing_models.rnn.RNNModel",
+    "tft": "concrete.analyzing_models.tft.TFTModel",
+    "ets": "concrete.analyzing_models.ets.ETSModel",
+    "gbm": "concrete.analyzing_models.gbm.GBMModel",
+}
+_loaded_model_classes = {}
+_model_classes_lock = threading.Lock()
 
-for model_name, model in models.items():
-    model_path = f"{MODELS_DIR}/{model_name}"
-    model_file = f"{model_path}/{model_name}_model.keras"
 
-    os.makedirs(model_path, exist_ok=True)
-    if os.path.exists(model_file):
-        logger.info(f"Loading saved model: {model_name}")
-        try:
-            model.load(model_path)
-            logger.info(f"Model {model_name} loaded successfully")
-        except Exception as e:
-            logger.error(f"Failed to load model {model_name}: {str(e)}")
-    else:
-        logger.info(
-            f"Model file for {model_name} not found at {model_file}. Will be trained when needed."
-        )
+def configure_tensorflow():
+    if INFERENCE_INTRA_OP_THREADS is None:
+        return
+    import tensorflow as tf
+
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(INFERENCE_INTRA_OP_THREADS)
+    except RuntimeError as e:
+        logger.warning(f"Could not set intra-op threads: {e}")
+
+
+def model_class(model_type: str):
+    with _model_classes_lock:
+        if model_type not in _loaded_model_classes:
+            if not _loaded_model_classes:
+                configure_tensorflow()
+            module_name, class_name = MODEL_CLASSES[model_type].rsplit(".", 1)
+            module = importlib.import_module(module_name)
+            _loaded_model_classes[model_type] = getattr(module, class_name)
+            logger.info(f"Imported model class for {model_type}")
+        return _loaded_model_classes[model_type]
+
+
+def model_spec(model_type: str, window_size: int):
+    if model_type == "ets":
+        # Период сезонности выбирается при обучении из ETS_SEASON_LENGTHS.
+        return model_class(model_type), {
+            "window_size": window_size,
+            "features": 1,
+            "season_lengths": [
+                int(length)
+                for length in os.environ.get(
+                    "ETS_SEASON_LENGTHS", "1,5,7,24,168"
+                ).split(",")
+            ],
+        }
+    if model_type == "gbm":
+        return model_class(model_type), {
+            "window_size": window_size,
+            "features": 1,
+            "n_jobs": int(os.environ.get("GBM_THREADS", 0)) or None,
+        }
+    parameters = {
+        "window_size": window_size,
+        "features": 1,
+        "forecast_mode": "direct",
+        "output_horizon": FORECAST_HORIZON,
+        "tflite_quantization": TFLITE_QUANTIZATION,
+        "inference_backend": INFERENCE_BACKEND,
+        "batch_size": int(os.environ.get(f"{model_type.upper()}_BATCH_SIZE", 32)),
+    }
+    if model_type == "tft":
+        parameters["quantiles"] = TFT_QUANTILES
+    return model_class(model_type), parameters
+
+
+# MICRO_BATCH_MAX_WAIT_MS=0 отключает объединение запросов в батчи.
+MICRO_BATCH_MAX_WAIT_MS = float(os.environ.get("MICRO_BATCH_MAX_WAIT_MS", 2))
+MICRO_BATCH_MAX_SIZE = int(os.environ.get("MICRO_BATCH_MAX_SIZE", 256))
+inference_scheduler = (
+    InferenceScheduler(
+        max_batch=MICRO_BATCH_MAX_SIZE,
+        max_wait_ms=MICRO_BATCH_MAX_WAIT_MS,
+    )
+    if MICRO_BATCH_MAX_WAIT_MS > 0
+    else None
+)
+# WARMUP_BATCH_SIZES: scheduler — формы батчей планировщика, степени двойки до
+# MICRO_BATCH_MAX_SIZE (без планировщика — как all); all — все формы, которые даёт
+# дополнение батчей до степени двойки; список через запятую — только указанные;
+# пустое значение отключает прогрев. Прогрев повторяется при каждой публикации версии.
+WARMUP_BATCH_SIZES = os.environ.get("WARMUP_BATCH_SIZES", "scheduler")
+if WARMUP_BATCH_SIZES == "scheduler" and inference_scheduler is not None:
+    warmup_batch_sizes = [
+        1 << power for power in range((MICRO_BATCH_MAX_SIZE - 1).bit_length() + 1)
+    ]
+elif WARMUP_BATCH_SIZES in ("scheduler", "all"):
+    warmup_batch_sizes = []
+elif WARMUP_BATCH_SIZES:
+    warmup_batch_sizes = [int(size) for size in WARMUP_BATCH_SIZES.split(",")]
+else:
+    warmup_batch_sizes = None
+models = ModelRegistry(
+    MODELS_DIR,
+    list(MODEL_CLASSES),
+    model_spec,
+    memory_budget_mb=int(os.environ.get("MODELS_MEMORY_BUDGET_MB", 1024)),
+    warmup_batch_sizes=warmup_batch_sizes,
+    keep_versions=int(os.environ.get("MODEL_KEEP_VERSIONS", 3)),
+    inference_scheduler=inference_scheduler,
+)
+# Интервал проверки указателей текущих версий моделей; 0 отключает горячую замену.
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", 5))
+training_jobs = TrainingJobManager(
+    models,
+    model_spec,
+    max_workers=int(os.environ.get("TRAINING_WORKERS", 1)),
+    fine_tune_epochs=int(os.environ.get("FINE_TUNE_EPOCHS", 3)),
+    scaler_update=os.environ.get("SCALER_UPDATE_RULE", "freeze"),
+    intra_op_threads=int(os.environ.get("TRAINING_INTRA_OP_THREADS", 0)) or None,
+    inter_op_threads=int(os.environ.get("TRAINING_INTER_OP_THREADS", 2)),
+    retained_jobs=int(os.environ.get("TRAINING_JOBS_RETAINED", 1000)),
+)
+# Срок на модель в многомодельных запросах: медленная модель (например, ещё
+# обучающаяся) получает ошибку, а остальные результаты возвращаются. Должен быть
+# меньше таймаута вызывающего сервиса (web ждёт 120 с).
+MODEL_EVALUATION_TIMEOUT = float(os.environ.get("MODEL_EVALUATION_TIMEOUT_SECONDS", 90))
+# Модели одного запроса считаются параллельно.
+FANOUT_WORKERS = int(os.environ.get("FANOUT_WORKERS", len(MODEL_CLASSES)))
+# Пул intra-op потоков TF общий на процесс, поделить его между воркерами нельзя:
+# INFERENCE_INTRA_OP_THREADS — верхний предел для всего инференса сервиса,
+# без значения TF использует все ядра.
+INFERENCE_INTRA_OP_THREADS = int(os.environ.get("INFERENCE_INTRA_OP_THREADS", 0)) or None
+fanout_executor = ThreadPoolExecutor(
+    max_workers=FANOUT_WORKERS, thread_name_prefix="fanout"
+)
+backtester = Backtester(
+    "backtests",
+    model_spec,
+    max_workers=int(os.environ.get("BACKTEST_WORKERS", 0)) or None,
+    refit_every=int(os.environ.get("BACKTEST_REFIT_EVERY", 5)),
+)
+INCREMENTAL_MIN_POINTS = int(os.environ.get("INCREMENTAL_MIN_POINTS", 1))
+result_cache = ResultCache(
+    max_entries=int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", 1024)),
+    ttl_seconds=float(os.environ.get("RESULT_CACHE_TTL_SECONDS", 3600)),
+)
+analysis_store = AnalysisStore(os.environ.get("ANALYSIS_DIR", "analysis_states"))
+
+
+# SERIES_SOURCE: db — чтение напрямую из TimescaleDB; service — через get_data
+# сервисов данных в бинарном колоночном формате.
+if os.environ.get("SERIES_SOURCE", "db") == "service":
+    series_reader = ServiceSeriesReader(SERIES_SERVICES)
+else:
+    series_reader = SeriesReader(
+        SERIES_SOURCES, max_size=int(os.environ.get("SERIES_POOL_SIZE", 4))
+    )
+
+
+def import_model_classes():
+    for model_type in MODEL_CLASSES:
+        model_class(model_type)
+
+
+def load_stored_models():
+    return {"loaded": len(models.preload())}
+
+
+def warm_up_models():
+    timings = {}
+    for key in models.loaded_keys():
+        timings["/".join(map(str, key))] = models.warm_up(key)
+    return timings
+
+
+# PREWARM: off — всё лениво; import — импорт TF и классов моделей в фоне;
+# models — дополнительно загрузка сохранённых моделей в реестр и их прогрев
+# пустыми батчами, чтобы XLA-компиляция не приходилась на первый запрос.
+PREWARM = os.environ.get("PREWARM", "models")
+PREWARM_STEPS = {
+    "off": [],
+    "import": [("import", import_model_classes)],
+    "models": [("import", import_model_classes), ("models", load_stored_models)]
+    + ([("warmup", warm_up_models)] if warmup_batch_sizes is not None else []),
+}
+prewarmer = Prewarmer(PREWARM_STEPS[PREWARM])
 
 
 async def get_action_parameters(request: Request, has_horizon=False):
     data_json = await request.json()
-    data = data_json.get("data", []).get("data", [])
+    data = data_json.get("data", {}).get("data", [])
     model_type = data_json.get("model_type", "cnn")
     ticker = data_json.get("ticker", "unknown")
+    check_ticker(ticker)
+    window_size = int(data_json.get("window_size", DEFAULT_WINDOW_SIZE))
     if has_horizon:
         horizon = data_json.get("horizon", 5)
         logger.debug(f"Received parameters: {data}, {model_type}, {ticker}, {horizon}")
-        return (data, model_type, ticker, horizon)
+        return (data, model_type, ticker, window_size, horizon)
     logger.debug(f"Received parameters: {data}, {model_type}, {ticker}")
-    return (data, model_type, ticker)
+    return (data, model_type, ticker, window_size)
 
 
 async def get_electricity_parameters(request: Request, has_horizon=False):
     data_json = await request.json()
-    data = data_json.get("data", []).get("data", [])
+    data = data_json.get("data", {}).get("data", [])
     model_type = data_json.get("model_type", "cnn")
+    window_size = int(data_json.get("window_size", DEFAULT_WINDOW_SIZE))
     if has_horizon:
         horizon = data_json.get("horizon", 5)
         logger.debug(f"Received parameters: {data}, {model_type}, {horizon}")
-        return (data, model_type, horizon)
+        return (data, model_type, window_size, horizon)
     logger.debug(f"Received parameters: {data}, {model_type}")
-    return (data, model_type)
+    return (data, model_type, window_size)
+
+
+def check_ticker(ticker):
+    # Тикер входит в пути артефактов моделей и состояний анализа.
+    if not isinstance(ticker, str) or not IDENTIFIER.fullmatch(ticker):
+        logger.error(f"Invalid ticker: {ticker}")
+        raise Exception({"error": f"Invalid ticker {ticker}"})
 
 
 def check_model(model_type):
@@ -69,43 +289,156 @@ def check_model(model_type):
         raise Exception({"error": f"Model type {model_type} not supported"})
 
 
+async def get_series(
+    domain: str, request: Request, ticker: str, data: list, purpose: str = "analysis"
+):
+    data_json = await request.json()
+    series = data_json.get("series")
+    lookback = get_lookback(data_json)
+    target_column = TARGET_COLUMNS[domain]
+    if not series:
+        if not data:
+            raise Exception(f"No data provided for {purpose}")
+        return convert_to_dataframe(data[-lookback:] if lookback else data, target_column)
+    df = await series_reader.read(
+        domain, ticker, series["from_date"], series["till_date"], limit=lookback
+    )
+    if df.empty:
+        raise Exception(f"No data found for {ticker} in {series}")
+    return df, df[[target_column]].values
+
+
+def get_lookback(data_json: dict):
+    # lookback ограничивает запрос последними точками ряда.
+    lookback = data_json.get("lookback")
+    if lookback is None:
+        return None
+    lookback = int(lookback)
+    if lookback < 1:
+        raise Exception("lookback must be a positive number of points")
+    return lookback
+
+
 def convert_to_dataframe(data, target_column: str):
     df = pd.DataFrame(data)
-    target = df[[target_column]].values
+    target = df[[target_column]].to_numpy(dtype=np.float32)
     logger.debug(f"Prepared {len(target)} price points for analysis")
     logger.debug(f"Target has type: {type(target)}")
     return (df, target)
 
 
-def train_and_save_models(model_type: str, target):
-    logger.debug(f"target has type: {type(target)}")
-    model_path = f"{MODELS_DIR}/{model_type}"
-    model_file = f"{model_path}/{model_type}_model.keras"
-    if not os.path.exists(model_file):
-        logger.info(f"Model {model_type} not trained yet, training now")
-        logger.debug(f"Scaler has type: {type(models[model_type].scaler)}")
-        models[model_type].scaler.fit(target)
-        models[model_type].train(target)
-        models[model_type].save(model_path)
-        logger.info(f"Model {model_type} trained and saved")
+def get_last_date_from_df(df: pd.DataFrame, column_name: str):
+    return pd.to_datetime(df[column_name]).max()
+
+
+def get_watermark(data: pd.DataFrame):
+    if "timestamp" not in data.columns:
+        return None
+    return str(get_last_date_from_df(data, "timestamp"))
+
+
+def get_timestamps(data: pd.DataFrame):
+    if "timestamp" not in data.columns:
+        return None
+    return pd.to_datetime(data["timestamp"]).to_numpy(dtype="datetime64[ns]")
+
+
+def model_inputs(model: "AnalyzingModel", data: pd.DataFrame):
+    if not model.uses_calendar:
+        return {}
+    return {"timestamps": get_timestamps(data)}
+
+
+def schedule_fine_tuning(
+    key, model: "AnalyzingModel", data: pd.DataFrame, target: np.ndarray, min_points=1
+):
+    if model.watermark is None or "timestamp" not in data.columns:
+        return None
+    timestamps = pd.to_datetime(data["timestamp"])
+    new_points = int((timestamps > pd.to_datetime(model.watermark)).sum())
+    if new_points < min_points:
+        return None
+    if model.fine_tune_lookback is None:
+        # Дообучение по всей истории: запрос с урезанным рядом (например, с lookback)
+        # не должен подменить ею уже выученную историю.
+        tail_length = len(target)
+        if tail_length < model.trained_points + new_points:
+            return None
     else:
-        try:
-            models[model_type].scaler.transform(target[:1])
-        except Exception as e:
-            logger.warning(f"Scaler for {model_type} not fitted, fitting now")
-            logger.debug(f"Scaler has type: {type(models[model_type].scaler)}")
-            models[model_type].scaler.fit(target)
+        tail_length = new_points + model.fine_tune_lookback
+        if len(target) < tail_length:
+            return None
+    logger.info(f"Model {key} is {new_points} points behind, scheduling fine-tuning")
+    return training_jobs.submit(
+        key,
+        target[-tail_length:],
+        watermark=str(timestamps.max()),
+        incremental=True,
+        timestamps=get_timestamps(data)[-tail_length:],
+    )
+
+
+async def get_model(
+    domain: str,
+    ticker: str,
+    model_type: str,
+    window_size: int,
+    data: pd.DataFrame,
+    target: np.ndarray,
+):
+    check_model(model_type)
+    key = (domain, ticker, model_type, window_size)
+    if not await run_in_threadpool(models.has_artifact, key):
+        logger.info(f"Model {key} not trained yet, waiting for training job")
+        job_id = await run_in_threadpool(
+            training_jobs.submit,
+            key,
+            target,
+            watermark=get_watermark(data),
+            timestamps=get_timestamps(data),
+        )
+        await training_jobs.wait(job_id)
+    model = await run_in_threadpool(models.get, key)
+    await run_in_threadpool(
+        schedule_fine_tuning, key, model, data, target, INCREMENTAL_MIN_POINTS
+    )
+    return model
+
+
+def analysis_cache_key(key: tuple, model: "AnalyzingModel", fingerprint: str):
+    # В ключ входит весь ключ модели: версии моделей разных рядов могут совпадать.
+    return ("analysis", *key, model.version, fingerprint)
+
+
+def forecast_cache_key(key: tuple, model: "AnalyzingModel", horizon: int, fingerprint: str):
+    return ("forecast", *key, model.version, horizon, fingerprint)
 
 
 def make_analysis(
-    data: pd.DataFrame, model_type: str, target: np.ndarray, ticker: str = None
+    data: pd.DataFrame,
+    key: tuple,
+    model: "AnalyzingModel",
+    target: np.ndarray,
 ):
+    _, ticker, model_type, _ = key
+    cache_key = analysis_cache_key(key, model, ResultCache.fingerprint(data))
+    cached_analysis = result_cache.get(cache_key)
+    if cached_analysis is not None:
+        logger.debug(f"Using cached {model_type} analysis")
+        return cached_analysis
+
     logger.debug(f"Starting analysis with {model_type} model")
-    analysis = models[model_type].analyze(target)
-    logger.debug(
-        f"Analysis completed for {ticker if ticker is not None else 'electricity'} using {model_type}: {analysis}"
+    analysis = describe_analysis(
+        analysis_store.analyze(key, model, target, **model_inputs(model, data)),
+        data,
+        target,
     )
+    logger.debug(f"Analysis completed for {ticker} using {model_type}: {analysis}")
+    result_cache.put(cache_key, analysis)
+    return analysis
 
+
+def describe_analysis(analysis: dict, data: pd.DataFrame, target: np.ndarray):
     analysis["data_points"] = len(target)
     analysis["start_date"] = (
         data["timestamp"].iloc[0] if "timestamp" in data.columns else None
@@ -119,61 +452,200 @@ def make_analysis(
 @analyzer.post("/analize_finance_data")
 async def analize_finance_data(request: Request):
     try:
-        data, model_type, ticker = await get_action_parameters(request)
+        data, model_type, ticker, window_size = await get_action_parameters(request)
         logger.info(f"Analyzing data for {ticker} with model {model_type}")
 
-        if not data:
-            raise Exception("No data provided for analysis")
-        df, prices = convert_to_dataframe(data, "close")
-        train_and_save_models(model_type, prices)
-        analysis = make_analysis(df, model_type, prices, ticker)
+        df, prices = await get_series("finance", request, ticker, data, "analysis")
+        model = await get_model(
+            "finance", ticker, model_type, window_size, df, prices
+        )
+        analysis = await run_in_threadpool(
+            make_analysis, df, ("finance", ticker, model_type, window_size), model, prices
+        )
         return {"ticker": ticker, "model": model_type, "analysis": analysis}
     except Exception as e:
         logger.error(f"Error during analysis: {str(e)}")
         return {"error": str(e)}
 
 
-def get_last_date_from_df(df: pd.DataFrame, column_name: str):
-    date_values = df[column_name]
-    last_date = pd.to_datetime(date_values[0])
-    for date in date_values:
-        last_date = max(last_date, pd.to_datetime(date))
-    return last_date
+def prediction_tail(model: "AnalyzingModel", data: pd.DataFrame, target: np.ndarray):
+    lookback = model.predict_lookback
+    if lookback is None or len(target) <= lookback:
+        return data, target
+    return data.iloc[-lookback:], target[-lookback:]
 
 
 def make_prediction(
-    data: pd.DataFrame, model_type: str, target: np.ndarray, horizon: int
+    data: pd.DataFrame,
+    key: tuple,
+    model: "AnalyzingModel",
+    target: np.ndarray,
+    horizon: int,
+    freq: str,
 ):
-    logger.debug(f"Starting prediction with {model_type} model")
-    predictions = models[model_type].predict(target, horizon=horizon)
+    # Прогноз зависит только от хвоста ряда: остальная история не масштабируется,
+    # не режется на окна и не участвует в отпечатке для кэша.
+    model_type = key[2]
+    data, target = prediction_tail(model, data, target)
+    cache_key = forecast_cache_key(key, model, horizon, ResultCache.fingerprint(data))
+    cached_forecast = result_cache.get(cache_key)
+    if cached_forecast is not None:
+        logger.debug(f"Using cached {model_type} forecast")
+        return cached_forecast
+
+    logger.debug(f"Starting prediction with {model_type} model on {len(target)} points")
+    predictions = model.predict(target, horizon=horizon, **model_inputs(model, data))
     logger.debug(f"Generated {len(predictions)} prediction points")
+    forecast = format_forecast(data, predictions, freq, model.quantiles)
+    result_cache.put(cache_key, forecast)
+    return forecast
+
+
+def make_analysis_and_prediction(
+    data: pd.DataFrame,
+    key: tuple,
+    model: "AnalyzingModel",
+    target: np.ndarray,
+    horizon: int,
+    freq: str,
+    fingerprint: str = None,
+):
+    model_type = key[2]
+    if fingerprint is None:
+        fingerprint = ResultCache.fingerprint(data)
+    analysis_key = analysis_cache_key(key, model, fingerprint)
+    forecast_key = forecast_cache_key(key, model, horizon, fingerprint)
+    analysis = result_cache.get(analysis_key)
+    forecast = result_cache.get(forecast_key)
+    if analysis is not None and forecast is not None:
+        logger.debug(f"Using cached {model_type} analysis and forecast")
+        return analysis, forecast
+
+    # Анализ досчитывается по новым точкам ряда, прогноз строится по его хвосту.
+    logger.debug(f"Starting combined analysis and prediction with {model_type} model")
+    analysis = describe_analysis(
+        analysis_store.analyze(key, model, target, **model_inputs(model, data)),
+        data,
+        target,
+    )
+    tail_data, tail_target = prediction_tail(model, data, target)
+    predictions = model.predict(
+        tail_target, horizon=horizon, **model_inputs(model, tail_data)
+    )
+    forecast = format_forecast(data, predictions, freq, model.quantiles)
+    result_cache.put(analysis_key, analysis)
+    result_cache.put(forecast_key, forecast)
+    return analysis, forecast
+
+
+async def evaluate_model(
+    domain: str,
+    ticker: str,
+    model_type: str,
+    window_size: int,
+    data: pd.DataFrame,
+    target: np.ndarray,
+    horizon: int,
+    fingerprint: str = None,
+):
+    model = await get_model(domain, ticker, model_type, window_size, data, target)
+    analysis, forecast = await asyncio.get_running_loop().run_in_executor(
+        fanout_executor,
+        make_analysis_and_prediction,
+        data,
+        (domain, ticker, model_type, window_size),
+        model,
+        target,
+        horizon,
+        FORECAST_FREQUENCIES[domain],
+        fingerprint,
+    )
+    return {
+        "model": model_type,
+        "analysis": analysis,
+        "horizon": horizon,
+        "forecast": forecast,
+        "last_observed_price": float(target[-1][0]) if len(target) > 0 else None,
+    }
+
+
+async def evaluate_models(
+    domain: str,
+    ticker: str,
+    model_types: list,
+    window_size: int,
+    data: pd.DataFrame,
+    target: np.ndarray,
+    horizon: int,
+):
+    fingerprint = ResultCache.fingerprint(data)
+
+    async def evaluate(model_type):
+        try:
+            return await asyncio.wait_for(
+                evaluate_model(
+                    domain,
+                    ticker,
+                    model_type,
+                    window_size,
+                    data,
+                    target,
+                    horizon,
+                    fingerprint,
+                ),
+                MODEL_EVALUATION_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            # Задача обучения продолжается в фоне, следующий запрос получит готовую модель.
+            logger.error(f"Evaluating {model_type} for {ticker} timed out")
+            return {"error": f"Model {model_type} timed out after {MODEL_EVALUATION_TIMEOUT} s"}
+        except Exception as e:
+            logger.error(f"Error evaluating {model_type} for {ticker}: {str(e)}")
+            return {"error": str(e)}
+
+    results = await asyncio.gather(*(evaluate(model_type) for model_type in model_types))
+    return dict(zip(model_types, results))
+
+
+def quantile_bands(predictions: np.ndarray, quantiles):
+    # Первая колонка — медиана (поле price), остальные отдаются как p10, p90 и т. п.
+    if not quantiles:
+        return [{} for _ in predictions]
+    return [
+        {f"p{round(level * 100)}": float(value) for level, value in zip(quantiles[1:], row[1:])}
+        for row in predictions
+    ]
+
+
+def format_forecast(
+    data: pd.DataFrame, predictions: np.ndarray, freq: str, quantiles=None
+):
     logger.debug(f"head of df: {data.head()}")
     try:
         last_date = get_last_date_from_df(data, "timestamp")
         logger.debug(f"Last date is {last_date}")
-        if len(data.columns) == 2:
-            dates = pd.date_range(
-                start=last_date + pd.Timedelta(days=1),
-                periods=len(predictions),
-                freq="H",
-            )
-        else:
-            dates = pd.date_range(
-                start=last_date + pd.Timedelta(days=1),
-                periods=len(predictions),
-                freq="D",
-            )
+        dates = pd.date_range(
+            start=last_date, periods=len(predictions) + 1, freq=freq
+        )[1:]
 
         forecast = [
-            {"timestamp": date.strftime("%Y-%m-%d %H:%M:%S"), "price": float(price[0])}
-            for date, price in zip(dates, predictions)
+            {
+                "timestamp": date.strftime("%Y-%m-%d %H:%M:%S"),
+                "price": float(price[0]),
+                **bands,
+            }
+            for date, price, bands in zip(
+                dates, predictions, quantile_bands(predictions, quantiles)
+            )
         ]
         logger.debug(f"Formatted prediction results: {len(forecast)} points")
     except Exception as e:
         logger.error(f"Error formatting prediction results: {str(e)}")
         forecast = [
-            {"step": i + 1, "price": float(price[0])}
-            for i, price in enumerate(predictions)
+            {"step": i + 1, "price": float(price[0]), **bands}
+            for i, (price, bands) in enumerate(
+                zip(predictions, quantile_bands(predictions, quantiles))
+            )
         ]
     finally:
         return forecast
@@ -182,22 +654,27 @@ def make_prediction(
 @analyzer.post("/predict_finance_data")
 async def predict_finance_data(request: Request):
     try:
-        data, model_type, ticker, horizon = await get_action_parameters(
+        data, model_type, ticker, window_size, horizon = await get_action_parameters(
             request, has_horizon=True
         )
         logger.info(
             f"Predicting for {ticker} with model {model_type}, horizon={horizon}"
         )
 
-        if not data:
-            raise Exception("No data provided for prediction")
-
-        check_model(model_type)
-
-        df, prices = convert_to_dataframe(data, "close")
-        train_and_save_models(model_type, prices)
+        df, prices = await get_series("finance", request, ticker, data, "prediction")
+        model = await get_model(
+            "finance", ticker, model_type, window_size, df, prices
+        )
 
-        forecast = make_prediction(df, model_type, prices, horizon)
+        forecast = await run_in_threadpool(
+            make_prediction,
+            df,
+            ("finance", ticker, model_type, window_size),
+            model,
+            prices,
+            horizon,
+            FORECAST_FREQUENCIES["finance"],
+        )
         logger.info(f"Prediction completed for {ticker} using {model_type}")
 
         return {
@@ -215,14 +692,22 @@ async def predict_finance_data(request: Request):
 @analyzer.post("/analize_electricity_data")
 async def analize_electricity_data(request: Request):
     try:
-        data, model_type = await get_electricity_parameters(request)
+        data, model_type, window_size = await get_electricity_parameters(request)
         logger.info(f"Analyzing data for electricity with model {model_type}")
 
-        if not data:
-            raise Exception("No data provided for analysis")
-        df, prices = convert_to_dataframe(data, "price")
-        train_and_save_models(model_type, prices)
-        analysis = make_analysis(df, model_type, prices)
+        df, prices = await get_series(
+            "electricity", request, ELECTRICITY_REGION, data, "analysis"
+        )
+        model = await get_model(
+            "electricity", ELECTRICITY_REGION, model_type, window_size, df, prices
+        )
+        analysis = await run_in_threadpool(
+            make_analysis,
+            df,
+            ("electricity", ELECTRICITY_REGION, model_type, window_size),
+            model,
+            prices,
+        )
         return {"model": model_type, "analysis": analysis}
     except Exception as e:
         logger.error(f"Error during analysis: {str(e)}")
@@ -232,22 +717,29 @@ async def analize_electricity_data(request: Request):
 @analyzer.post("/predict_electricity_data")
 async def predict_electricity_data(request: Request):
     try:
-        data, model_type, horizon = await get_electricity_parameters(
+        data, model_type, window_size, horizon = await get_electricity_parameters(
             request, has_horizon=True
         )
         logger.info(
             f"Predicting for electricity with model {model_type}, horizon={horizon}"
         )
 
-        if not data:
-            raise Exception("No data provided for prediction")
-
-        check_model(model_type)
-
-        df, prices = convert_to_dataframe(data, "price")
-        train_and_save_models(model_type, prices)
+        df, prices = await get_series(
+            "electricity", request, ELECTRICITY_REGION, data, "prediction"
+        )
+        model = await get_model(
+            "electricity", ELECTRICITY_REGION, model_type, window_size, df, prices
+        )
 
-        forecast = make_prediction(df, model_type, prices, horizon)
+        forecast = await run_in_threadpool(
+            make_prediction,
+            df,
+            ("electricity", ELECTRICITY_REGION, model_type, window_size),
+            model,
+            prices,
+            horizon,
+            FORECAST_FREQUENCIES["electricity"],
+        )
         logger.info(f"Prediction completed for electricity using {model_type}")
 
         return {
@@ -259,3 +751,269 @@ async def predict_electricity_data(request: Request):
     except Exception as e:
         logger.error(f"Error during prediction: {str(e)}")
         return {"error": str(e)}
+
+
+@analyzer.post("/analize_and_predict_finance_data")
+async def analize_and_predict_finance_data(request: Request):
+    try:
+        data, model_type, ticker, window_size, horizon = await get_action_parameters(
+            request, has_horizon=True
+        )
+        logger.info(
+            f"Analyzing and predicting for {ticker} with model {model_type}, horizon={horizon}"
+        )
+
+        df, prices = await get_series("finance", request, ticker, data, "analysis")
+        result = await evaluate_model(
+            "finance", ticker, model_type, window_size, df, prices, horizon
+        )
+        return {"ticker": ticker, **result}
+    except Exception as e:
+        logger.error(f"Error during analysis and prediction: {str(e)}")
+        return {"error": str(e)}
+
+
+@analyzer.post("/analize_and_predict_electricity_data")
+async def analize_and_predict_electricity_data(request: Request):
+    try:
+        data, model_type, window_size, horizon = await get_electricity_parameters(
+            request, has_horizon=True
+        )
+        logger.info(
+            f"Analyzing and predicting for electricity with model {model_type}, horizon={horizon}"
+        )
+
+        df, prices = await get_series(
+            "electricity", request, ELECTRICITY_REGION, data, "analysis"
+        )
+        return await evaluate_model(
+            "electricity",
+            ELECTRICITY_REGION,
+            model_type,
+            window_size,
+            df,
+            prices,
+            horizon,
+        )
+    except Exception as e:
+        logger.error(f"Error during analysis and prediction: {str(e)}")
+        return {"error": str(e)}
+
+
+async def get_model_types(request: Request):
+    data_json = await request.json()
+    return data_json.get("model_types") or models.model_types
+
+
+@analyzer.post("/analize_and_predict_finance_models")
+async def analize_and_predict_finance_models(request: Request):
+    try:
+        data, _, ticker, window_size, horizon = await get_action_parameters(
+            request, has_horizon=True
+        )
+        model_types = await get_model_types(request)
+        logger.info(
+            f"Analyzing and predicting for {ticker} with models {model_types}, horizon={horizon}"
+        )
+
+        df, prices = await get_series("finance", request, ticker, data, "analysis")
+        results = await evaluate_models(
+            "finance", ticker, model_types, window_size, df, prices, horizon
+        )
+        return {"ticker": ticker, "models": results}
+    except Exception as e:
+        logger.error(f"Error during multi-model analysis: {str(e)}")
+        return {"error": str(e)}
+
+
+@analyzer.post("/analize_and_predict_electricity_models")
+async def analize_and_predict_electricity_models(request: Request):
+    try:
+        data, _, window_size, horizon = await get_electricity_parameters(
+            request, has_horizon=True
+        )
+        model_types = await get_model_types(request)
+        logger.info(
+            f"Analyzing and predicting for electricity with models {model_types}, horizon={horizon}"
+        )
+
+        df, prices = await get_series(
+            "electricity", request, ELECTRICITY_REGION, data, "analysis"
+        )
+        results = await evaluate_models(
+            "electricity",
+            ELECTRICITY_REGION,
+            model_types,
+            window_size,
+            df,
+            prices,
+            horizon,
+        )
+        return {"models": results}
+    except Exception as e:
+        logger.error(f"Error during multi-model analysis: {str(e)}")
+        return {"error": str(e)}
+
+
+@analyzer.get("/models")
+async def available_models():
+    return {"available_models": models.model_types}
+
+
+@analyzer.get("/cache_stats")
+async def cache_stats():
+    return result_cache.stats()
+
+
+@analyzer.get("/analysis_stats")
+async def analysis_stats():
+    return analysis_store.stats()
+
+
+@analyzer.get("/inference_stats")
+async def inference_stats():
+    if inference_scheduler is None:
+        return {"micro_batching": False}
+    return {"micro_batching": True, **inference_scheduler.stats()}
+
+
+@analyzer.post("/backtest")
+async def backtest(request: Request):
+    try:
+        data_json = await request.json()
+        domain = data_json.get("domain", "finance")
+        tickers = data_json.get("tickers")
+        if not tickers:
+            # Регион по умолчанию есть только у электроэнергии.
+            if domain != "electricity":
+                logger.error(f"No tickers given for {domain} backtest")
+                raise Exception({"error": f"Tickers are required for {domain} backtests"})
+            tickers = [ELECTRICITY_REGION]
+        for ticker in tickers:
+            check_ticker(ticker)
+        model_types = data_json.get("model_types") or models.model_types
+        window_size = int(data_json.get("window_size", DEFAULT_WINDOW_SIZE))
+        horizon = int(data_json.get("horizon", FORECAST_HORIZON))
+        series = data_json["series"]
+        if data_json.get("initial_size") is None:
+            # От начального размера зависят метки точек отсечения и повторное использование фолдов.
+            logger.error("No initial_size given for backtest")
+            raise Exception({"error": "initial_size is required for backtests"})
+        initial_size = int(data_json["initial_size"])
+        for model_type in model_types:
+            check_model(model_type)
+        frames = await asyncio.gather(
+            *(
+                series_reader.read(
+                    domain, ticker, series["from_date"], series["till_date"]
+                )
+                for ticker in tickers
+            )
+        )
+        series_by_ticker = {
+            (domain, ticker): (get_timestamps(df), df[[TARGET_COLUMNS[domain]]].values)
+            for ticker, df in zip(tickers, frames)
+        }
+        keys = [
+            (domain, ticker, model_type, window_size)
+            for ticker in tickers
+            for model_type in model_types
+        ]
+        logger.info(f"Backtesting {model_types} on {len(tickers)} {domain} series")
+        summaries = await run_in_threadpool(
+            backtester.run,
+            keys,
+            series_by_ticker,
+            horizon,
+            int(data_json.get("step", horizon)),
+            initial_size,
+        )
+        return {
+            "results": [
+                {"ticker": key[1], "model": key[2], **summary}
+                for key, summary in summaries.items()
+            ]
+        }
+    except Exception as e:
+        logger.error(f"Error during backtesting: {str(e)}")
+        return {"error": str(e)}
+
+
+async def submit_training(domain: str, ticker: str, request: Request):
+    data_json = await request.json()
+    data = data_json.get("data", {}).get("data", [])
+    model_type = data_json.get("model_type", "cnn")
+    window_size = int(data_json.get("window_size", DEFAULT_WINDOW_SIZE))
+    check_ticker(ticker)
+    check_model(model_type)
+    df, target = await get_series(domain, request, ticker, data, "training")
+    key = (domain, ticker, model_type, window_size)
+    if data_json.get("mode", "full") == "incremental":
+        model = await run_in_threadpool(models.get, key)
+        job_id = await run_in_threadpool(schedule_fine_tuning, key, model, df, target)
+        if job_id is None:
+            return {"status": "up_to_date", "watermark": model.watermark}
+    else:
+        job_id = await run_in_threadpool(
+            training_jobs.submit,
+            key,
+            target,
+            watermark=get_watermark(df),
+            timestamps=get_timestamps(df),
+        )
+    return {"job_id": job_id, "status": training_jobs.status(job_id)["status"]}
+
+
+@analyzer.post("/train_finance_model")
+async def train_finance_model(request: Request):
+    try:
+        data_json = await request.json()
+        return await submit_training(
+            "finance", data_json.get("ticker", "unknown"), request
+        )
+    except Exception as e:
+        logger.error(f"Error submitting training job: {str(e)}")
+        return {"error": str(e)}
+
+
+@analyzer.post("/train_electricity_model")
+async def train_electricity_model(request: Request):
+    try:
+        return await submit_training("electricity", ELECTRICITY_REGION, request)
+    except Exception as e:
+        logger.error(f"Error submitting training job: {str(e)}")
+        return {"error": str(e)}
+
+
+@analyzer.get("/training_jobs")
+async def list_training_jobs():
+    return {"jobs": training_jobs.jobs()}
+
+
+@analyzer.get("/training_jobs/{job_id}")
+async def get_training_job(job_id: str):
+    try:
+        return training_jobs.status(job_id)
+    except KeyError as e:
+        return {"error": str(e)}
+
+
+@analyzer.get("/ready")
+async def ready():
+    status = prewarmer.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
+@analyzer.on_event("startup")
+async def startup():
+    prewarmer.start()
+    if MODEL_WATCH_INTERVAL > 0:
+        models.start_watching(MODEL_WATCH_INTERVAL)
+
+
+@analyzer.on_event("shutdown")
+async def shutdown():
+    models.stop_watching()
+    training_jobs.shutdown()
+    fanout_executor.shutdown(wait=False)
+    await series_reader.close()
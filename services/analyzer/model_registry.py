@@ -0,0 +1,312 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+import os
+import shutil
+import threading
+import uuid
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+from logger import Logger
+
+if TYPE_CHECKING:
+    # Импорт только для аннотаций: TensorFlow подгружается вместе с классом модели.
+    from abstractions.analyzing_model import AnalyzingModel
+
+ModelKey = Tuple[str, str, str, int]
+# Каждая версия модели пишется в свой каталог versions/<версия>, а текущая
+# определяется файлом-указателем, который заменяется атомарно через os.replace.
+POINTER_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+
+
+class ModelRegistry:
+    _models_dir: str
+    _model_spec: Callable[[str, int], Tuple[type, dict]]
+    _memory_budget: int
+    _model_overhead: int
+    _models: OrderedDict
+    _sizes: Dict[ModelKey, int]
+    _logger: Logger
+
+    def __init__(
+        self,
+        models_dir: str,
+        model_types: List[str],
+        model_spec: Callable[[str, int], Tuple[type, dict]],
+        memory_budget_mb: int = 1024,
+        model_overhead_mb: int = 4,
+        warmup_batch_sizes: Optional[List[int]] = None,
+        keep_versions: int = 3,
+        inference_scheduler=None,
+    ):
+        self._models_dir = models_dir
+        self._model_types = model_types
+        self._model_spec = model_spec
+        self._memory_budget = memory_budget_mb * 2**20
+        self._model_overhead = model_overhead_mb * 2**20
+        self._warmup_batch_sizes = warmup_batch_sizes
+        self._keep_versions = keep_versions
+        self._inference_scheduler = inference_scheduler
+        self._models = OrderedDict()
+        self._sizes = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._watcher = None
+        self._stop_watching = threading.Event()
+        self._logger = Logger("ModelRegistry")
+
+    @property
+    def model_types(self):
+        return list(self._model_types)
+
+    def __contains__(self, model_type: str) -> bool:
+        return model_type in self._model_types
+
+    def model_path(self, key: ModelKey) -> str:
+        domain, ticker, model_type, window_size = key
+        return f"{self._models_dir}/{domain}/{ticker}/{model_type}_{window_size}"
+
+    def new_version_path(self, key: ModelKey) -> str:
+        # Имена версий сортируются по времени создания.
+        version = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+        return f"{self.model_path(key)}/{VERSIONS_DIR}/{version}"
+
+    def current_version(self, key: ModelKey) -> Optional[str]:
+        try:
+            with open(f"{self.model_path(key)}/{POINTER_FILE}") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def artifact_path(self, key: ModelKey) -> str:
+        version = self.current_version(key)
+        if version is None:
+            # Модели, сохранённые до версионирования, лежат прямо в каталоге модели.
+            return self.model_path(key)
+        return f"{self.model_path(key)}/{VERSIONS_DIR}/{version}"
+
+    def loaded_version(self, key: ModelKey) -> Optional[str]:
+        with self._lock:
+            return self._versions.get(key)
+
+    def memory_usage(self) -> int:
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def loaded_keys(self):
+        with self._lock:
+            return list(self._models)
+
+    def stored_keys(self) -> List[ModelKey]:
+        keys = []
+        if not os.path.isdir(self._models_dir):
+            return keys
+        for domain in sorted(os.listdir(self._models_dir)):
+            domain_dir = f"{self._models_dir}/{domain}"
+            if not os.path.isdir(domain_dir):
+                continue
+            for ticker in sorted(os.listdir(domain_dir)):
+                ticker_dir = f"{domain_dir}/{ticker}"
+                if not os.path.isdir(ticker_dir):
+                    continue
+                for name in sorted(os.listdir(ticker_dir)):
+                    model_type, _, window_size = name.rpartition("_")
+                    if model_type not in self._model_types or not window_size.isdigit():
+                        continue
+                    model_dir = f"{ticker_dir}/{name}"
+                    # Версии без указателя ещё обучаются и не опубликованы.
+                    if os.path.isdir(f"{model_dir}/{VERSIONS_DIR}") and not os.path.exists(
+                        f"{model_dir}/{POINTER_FILE}"
+                    ):
+                        continue
+                    keys.append((domain, ticker, model_type, int(window_size)))
+        return keys
+
+    def has_artifact(self, key: ModelKey) -> bool:
+        if self._get_loaded(key) is not None:
+            return True
+        model_class, _ = self._spec(key)
+        return model_class.has_artifact(self.artifact_path(key))
+
+    def get(self, key: ModelKey) -> "AnalyzingModel":
+        model = self._get_loaded(key)
+        if model is not None:
+            return model
+
+        with self._key_lock(key):
+            model = self._get_loaded(key)
+            if model is not None:
+                return model
+
+            model, version = self._load(key)
+            self._put(key, model, version)
+            return model
+
+    def preload(self) -> List[ModelKey]:
+        # Загрузка при старте: сначала недавно опубликованные модели и только пока
+        # они помещаются в бюджет памяти — иначе следующие вытесняли бы предыдущие.
+        keys = sorted(self.stored_keys(), key=self._published_at, reverse=True)
+        loaded = []
+        for key in keys:
+            with self._key_lock(key):
+                if self._get_loaded(key) is None:
+                    try:
+                        model, version = self._load(key)
+                    except KeyError as e:
+                        self._logger.warning(f"Skipping preload of {key}: {e}")
+                        continue
+                    size = model.memory_footprint() + self._model_overhead
+                    if self.memory_usage() + size > self._memory_budget and loaded:
+                        self._logger.info(
+                            f"Memory budget is full, remaining stored models stay on disk"
+                        )
+                        break
+                    self._put(key, model, version)
+            loaded.append(key)
+        with self._lock:
+            # Самые свежие модели вытесняются последними.
+            for key in reversed(loaded):
+                if key in self._models:
+                    self._models.move_to_end(key)
+        return loaded
+
+    def warm_up(self, key: ModelKey) -> dict:
+        return self.get(key).warm_up(self._warmup_batch_sizes)
+
+    def publish(self, key: ModelKey, version_path: str):
+        version = os.path.basename(version_path)
+        model = self._prepare(key, version_path)
+        with self._key_lock(key):
+            self._write_pointer(key, version)
+            self._put(key, model, version)
+        self._prune(key, version)
+        self._logger.info(f"Published model {key} version {version}")
+
+    def refresh(self) -> List[ModelKey]:
+        # Подхватывает версии, опубликованные другими процессами: новая модель
+        # загружается рядом со старой, а ссылка переключается, когда она готова.
+        swapped = []
+        for key in self.loaded_keys():
+            version = self.current_version(key)
+            if version is None or version == self.loaded_version(key):
+                continue
+            try:
+                model = self._prepare(key, self.artifact_path(key))
+            except Exception as e:
+                self._logger.error(f"Failed to load version {version} of {key}: {e}")
+                continue
+            with self._key_lock(key):
+                with self._lock:
+                    still_loaded = key in self._models
+                if not still_loaded or self.current_version(key) != version:
+                    continue
+                self._put(key, model, version)
+            self._logger.info(f"Hot-swapped model {key} to version {version}")
+            swapped.append(key)
+        return swapped
+
+    def start_watching(self, interval: float):
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="model-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop_watching.set()
+        self._watcher = None
+
+    def _watch(self, interval: float):
+        while not self._stop_watching.wait(interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                self._logger.error(f"Model watcher failed: {e}")
+
+    def _prepare(self, key: ModelKey, path: str) -> "AnalyzingModel":
+        model = self._create(key)
+        model.load(path)
+        model.build_inference()
+        if self._warmup_batch_sizes is not None and self._get_loaded(key) is not None:
+            # Заменяемая модель продолжает обслуживать запросы, пока новая прогревается.
+            model.warm_up(self._warmup_batch_sizes)
+        return model
+
+    def _load(self, key: ModelKey):
+        version = self.current_version(key)
+        model_path = self.artifact_path(key)
+        model_class, _ = self._spec(key)
+        if not model_class.has_artifact(model_path):
+            raise KeyError(f"Model {key} is not trained")
+        model = self._create(key)
+        self._logger.info(f"Loading model {key} from {model_path}")
+        model.load(model_path)
+        model.build_inference()
+        return model, version
+
+    def _published_at(self, key: ModelKey) -> float:
+        pointer = f"{self.model_path(key)}/{POINTER_FILE}"
+        return os.path.getmtime(pointer if os.path.exists(pointer) else self.model_path(key))
+
+    def _write_pointer(self, key: ModelKey, version: str):
+        pointer = f"{self.model_path(key)}/{POINTER_FILE}"
+        with open(f"{pointer}.tmp", "w") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{pointer}.tmp", pointer)
+
+    def _prune(self, key: ModelKey, current: str):
+        # Хранятся текущая и несколько предыдущих версий для отката;
+        # более новые каталоги могут принадлежать идущим обучениям и не трогаются.
+        versions_dir = f"{self.model_path(key)}/{VERSIONS_DIR}"
+        published = sorted(name for name in os.listdir(versions_dir) if name <= current)
+        for name in published[: -self._keep_versions]:
+            shutil.rmtree(f"{versions_dir}/{name}", ignore_errors=True)
+
+    def evict(self, key: ModelKey):
+        with self._lock:
+            self._models.pop(key, None)
+            self._sizes.pop(key, None)
+            self._versions.pop(key, None)
+
+    def _spec(self, key: ModelKey):
+        _, _, model_type, window_size = key
+        if model_type not in self._model_types:
+            raise KeyError(f"Model type {model_type} not supported")
+        return self._model_spec(model_type, window_size)
+
+    def _create(self, key: ModelKey) -> "AnalyzingModel":
+        model_class, model_parameters = self._spec(key)
+        model = model_class(**model_parameters)
+        model.inference_scheduler = self._inference_scheduler
+        return model
+
+    def _get_loaded(self, key: ModelKey):
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+            return model
+
+    def _key_lock(self, key: ModelKey) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _put(self, key: ModelKey, model: "AnalyzingModel", version: Optional[str]):
+        size = model.memory_footprint() + self._model_overhead
+        with self._lock:
+            self._models[key] = model
+            self._sizes[key] = size
+            self._versions[key] = version
+            self._models.move_to_end(key)
+            while len(self._models) > 1 and sum(self._sizes.values()) > self._memory_budget:
+                evicted_key, _ = self._models.popitem(last=False)
+                self._sizes.pop(evicted_key)
+                self._versions.pop(evicted_key, None)
+                self._logger.info(f"Evicted model {evicted_key} from memory")
+            self._logger.debug(
+                f"Models in memory: {len(self._models)}, estimated size: {sum(self._sizes.values())} bytes"
+            )
@@ -0,0 +1,69 @@
+from datetime import datetime
+import threading
+import time
+from typing import Callable, List, Tuple
+from logger import Logger
+
+
+class Prewarmer:
+    _steps: List[Tuple[str, Callable[[], None]]]
+    _logger: Logger
+
+    def __init__(self, steps: List[Tuple[str, Callable[[], None]]]):
+        self._steps = steps
+        self._status = "idle" if steps else "ready"
+        self._timings = {}
+        self._details = {}
+        self._error = None
+        self._started_at = None
+        self._finished_at = None
+        self._thread = None
+        self._ready = threading.Event()
+        if not steps:
+            self._ready.set()
+        self._logger = Logger("Prewarmer")
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def start(self):
+        if self._thread is not None or not self._steps:
+            return
+        self._status = "warming"
+        self._started_at = datetime.now().isoformat()
+        self._thread = threading.Thread(target=self._run, name="prewarm", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def _run(self):
+        try:
+            for name, step in self._steps:
+                started = time.perf_counter()
+                details = step()
+                if details is not None:
+                    self._details[name] = details
+                self._timings[name] = round(time.perf_counter() - started, 3)
+                self._logger.info(f"Pre-warm step {name} took {self._timings[name]}s")
+            self._status = "ready"
+        except Exception as e:
+            # Ошибка прогрева не блокирует сервис: модели загрузятся по первому запросу.
+            self._status = "failed"
+            self._error = str(e)
+            self._logger.error(f"Pre-warm failed: {e}")
+        finally:
+            self._finished_at = datetime.now().isoformat()
+            self._ready.set()
+
+    def status(self) -> dict:
+        return {
+            "status": self._status,
+            "ready": self.ready,
+            "started_at": self._started_at,
+            "finished_at": self._finished_at,
+            "timings": dict(self._timings),
+            "details": dict(self._details),
+            "error": self._error,
+        }
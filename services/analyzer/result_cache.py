@@ -0,0 +1,68 @@
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+import pandas as pd
+from logger import Logger
+
+
+class ResultCache:
+    _max_entries: int
+    _ttl_seconds: float
+    _entries: OrderedDict
+    _logger: Logger
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._logger = Logger("ResultCache")
+
+    @staticmethod
+    def fingerprint(data: pd.DataFrame) -> str:
+        hashes = pd.util.hash_pandas_object(data, index=False).values
+        return hashlib.blake2b(hashes.tobytes(), digest_size=16).hexdigest()
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                self._logger.debug(f"Cache miss for {key}")
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self._logger.debug(f"Cache hit for {key}")
+            return entry[1]
+
+    def put(self, key: tuple, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self._max_entries,
+                "ttl_seconds": self._ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / requests if requests else 0.0,
+            }
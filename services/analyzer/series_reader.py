@@ -0,0 +1,168 @@
+import asyncio
+from datetime import datetime
+import io
+import re
+from typing import Dict
+import asyncpg
+import httpx
+import numpy as np
+import pandas as pd
+from columnar_format import MEDIA_TYPE, decode_columns
+from logger import Logger
+
+# Бинарный COPY: заголовок (сигнатура, флаги, длина расширения), затем строки
+# фиксированной ширины: число полей, длина и значение timestamp, длина и значение float4.
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+COPY_ROW = np.dtype(
+    [
+        ("fields", ">i2"),
+        ("timestamp_size", ">i4"),
+        ("timestamp", ">i8"),
+        ("value_size", ">i4"),
+        ("value", ">f4"),
+    ]
+)
+POSTGRES_EPOCH = np.datetime64("2000-01-01T00:00:00", "us")
+IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def decode_copy(buffer: bytes):
+    if not buffer.startswith(COPY_SIGNATURE):
+        raise ValueError("Not a binary COPY stream")
+    extension_size = int.from_bytes(buffer[15:19], "big")
+    rows = np.frombuffer(buffer[19 + extension_size : -2], dtype=COPY_ROW)
+    timestamps = POSTGRES_EPOCH + rows["timestamp"].astype("timedelta64[us]")
+    return timestamps.astype("datetime64[ns]"), rows["value"].astype(np.float32)
+
+
+class SeriesReader:
+    _sources: Dict[str, dict]
+    _pools: Dict[str, asyncpg.Pool]
+    _logger: Logger
+
+    def __init__(self, sources: Dict[str, dict], min_size: int = 1, max_size: int = 4):
+        self._sources = sources
+        self._min_size = min_size
+        self._max_size = max_size
+        self._pools = {}
+        self._lock = asyncio.Lock()
+        self._logger = Logger("SeriesReader")
+
+    async def _pool(self, domain: str) -> asyncpg.Pool:
+        if domain not in self._sources:
+            raise KeyError(f"Unknown series domain {domain}")
+        async with self._lock:
+            if domain not in self._pools:
+                source = self._sources[domain]
+                self._pools[domain] = await asyncpg.create_pool(
+                    user=source["user"],
+                    password=source["password"],
+                    database=source["database"],
+                    host=source["host"],
+                    port=source["port"],
+                    min_size=self._min_size,
+                    max_size=self._max_size,
+                    server_settings={"default_transaction_read_only": "on"},
+                )
+                self._logger.info(f"Created read-only connection pool for {domain}")
+            return self._pools[domain]
+
+    async def read(
+        self,
+        domain: str,
+        ticker: str,
+        from_date: str,
+        till_date: str,
+        limit: int = None,
+    ) -> pd.DataFrame:
+        source = self._sources[domain]
+        table = source.get("table") or ticker
+        column = source["column"]
+        if not IDENTIFIER.match(table):
+            raise ValueError(f"Invalid series name {table}")
+        # Значения выбираются сразу в float4 — типе, в котором с рядом работают модели.
+        query = f"""
+        SELECT timestamp, {column}::float4 FROM {table}
+        WHERE timestamp BETWEEN $1 AND $2 AND {column} IS NOT NULL
+        ORDER BY timestamp
+        """
+        arguments = [datetime.fromisoformat(from_date), datetime.fromisoformat(till_date)]
+        if limit is not None:
+            # Последние limit точек берутся обратным проходом по индексу timestamp.
+            query = f"""
+            SELECT * FROM (
+                SELECT timestamp, {column}::float4 FROM {table}
+                WHERE timestamp BETWEEN $1 AND $2 AND {column} IS NOT NULL
+                ORDER BY timestamp DESC LIMIT $3
+            ) AS tail ORDER BY timestamp
+            """
+            arguments.append(limit)
+        output = io.BytesIO()
+        pool = await self._pool(domain)
+        async with pool.acquire() as connection:
+            await connection.copy_from_query(
+                query, *arguments, output=output, format="binary"
+            )
+        timestamps, values = decode_copy(output.getvalue())
+        self._logger.info(
+            f"Read {len(values)} points of {table}.{column} between {from_date} and {till_date}"
+        )
+        return pd.DataFrame({"timestamp": timestamps, column: values})
+
+    async def close(self):
+        async with self._lock:
+            for pool in self._pools.values():
+                await pool.close()
+            self._pools.clear()
+
+
+class ServiceSeriesReader:
+    _sources: Dict[str, dict]
+    _logger: Logger
+
+    def __init__(
+        self,
+        sources: Dict[str, dict],
+        timeout: float = 60.0,
+        transport: httpx.AsyncBaseTransport = None,
+    ):
+        self._sources = sources
+        self._client = httpx.AsyncClient(
+            timeout=timeout, headers={"Accept": MEDIA_TYPE}, transport=transport
+        )
+        self._logger = Logger("ServiceSeriesReader")
+
+    async def read(
+        self,
+        domain: str,
+        ticker: str,
+        from_date: str,
+        till_date: str,
+        limit: int = None,
+    ) -> pd.DataFrame:
+        if domain not in self._sources:
+            raise KeyError(f"Unknown series domain {domain}")
+        source = self._sources[domain]
+        response = await self._client.get(
+            source["url"],
+            params={"ticker": ticker, "from_date": from_date, "till_date": till_date},
+        )
+        response.raise_for_status()
+        if not response.headers.get("content-type", "").startswith(MEDIA_TYPE):
+            raise ValueError(f"{source['url']} did not return columnar data")
+        columns, _ = decode_columns(response.content)
+        column = source["column"]
+        self._logger.info(
+            f"Received {len(columns[column])} points of {domain} {ticker} ({len(response.content)} bytes)"
+        )
+        # Сервисы не гарантируют порядок строк: хвост берётся после сортировки по времени.
+        df = pd.DataFrame(
+            {
+                "timestamp": columns["timestamp"],
+                column: columns[column].astype(np.float32, copy=False),
+            }
+        ).sort_values("timestamp", kind="stable", ignore_index=True)
+        return df if limit is None else df.iloc[-limit:].reset_index(drop=True)
+
+    async def close(self):
+        await self._client.aclose()
@@ -0,0 +1,272 @@
+import asyncio
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+import multiprocessing
+import os
+import shutil
+import threading
+import uuid
+from typing import Callable, Dict, Tuple
+import numpy as np
+from logger import Logger
+from model_registry import ModelKey, ModelRegistry
+
+
+def configure_training_threads(intra_op_threads: int, inter_op_threads: int):
+    # Вызывается один раз при старте процесса обучения, до первой операции TF.
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+
+def training_progress(job_id: str, progress):
+    # TensorFlow импортируется только в процессе обучения, а не в API-процессе.
+    import tensorflow as tf
+
+    class TrainingProgress(tf.keras.callbacks.Callback):
+        def on_epoch_end(self, epoch, logs=None):
+            progress[job_id] = {
+                "epoch": epoch + 1,
+                "epochs": self.params.get("epochs"),
+                "loss": float((logs or {}).get("loss", 0.0)),
+            }
+
+    return TrainingProgress()
+
+
+def run_training(
+    job_id: str,
+    model_class,
+    model_parameters: dict,
+    target: np.ndarray,
+    watermark: str,
+    staging_path: str,
+    progress,
+    inputs: dict = None,
+) -> str:
+    progress[job_id] = {"epoch": 0, "epochs": None, "loss": None}
+    model = model_class(**model_parameters)
+    model.train(target, callbacks=[training_progress(job_id, progress)], **(inputs or {}))
+    model.watermark = watermark
+    model.trained_points = len(target)
+    os.makedirs(staging_path, exist_ok=True)
+    model.save(staging_path)
+    return model.version
+
+
+def run_fine_tuning(
+    job_id: str,
+    model_class,
+    model_parameters: dict,
+    target: np.ndarray,
+    watermark: str,
+    staging_path: str,
+    progress,
+    model_path: str,
+    epochs: int,
+    scaler_update: str,
+    inputs: dict = None,
+) -> str:
+    progress[job_id] = {"epoch": 0, "epochs": epochs, "loss": None}
+    model = model_class(**model_parameters)
+    model.load(model_path)
+    model.scaler_update = scaler_update
+    model.fine_tune(
+        target,
+        epochs=epochs,
+        callbacks=[training_progress(job_id, progress)],
+        **(inputs or {}),
+    )
+    model.watermark = watermark
+    os.makedirs(staging_path, exist_ok=True)
+    model.save(staging_path)
+    return model.version
+
+
+class TrainingJobManager:
+    _registry: ModelRegistry
+    _model_spec: Callable[[str, int], Tuple[type, dict]]
+    _max_workers: int
+    _jobs: Dict[str, dict]
+    _active_jobs: Dict[ModelKey, str]
+    _logger: Logger
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        model_spec: Callable[[str, int], Tuple[type, dict]],
+        max_workers: int = 1,
+        fine_tune_epochs: int = 3,
+        scaler_update: str = "freeze",
+        intra_op_threads: int = None,
+        inter_op_threads: int = 2,
+        retained_jobs: int = 1000,
+    ):
+        self._registry = registry
+        self._model_spec = model_spec
+        self._max_workers = max_workers
+        self._fine_tune_epochs = fine_tune_epochs
+        self._scaler_update = scaler_update
+        # По умолчанию ядра делятся поровну между процессами обучения.
+        self._intra_op_threads = intra_op_threads or max(
+            1, (os.cpu_count() or 1) // max_workers
+        )
+        self._inter_op_threads = inter_op_threads
+        self._executor = None
+        # Публикация (загрузка модели и прогрев) идёт в своём потоке: колбэки пула
+        # процессов выполняет его служебный поток, который раздаёт задачи и собирает результаты.
+        self._publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="training-publish")
+        self._manager = None
+        self._progress = None
+        self._jobs = {}
+        self._done = {}
+        self._active_jobs = {}
+        # Записи завершённых задач хранятся для /training_jobs, но не больше retained_jobs.
+        self._retained_jobs = retained_jobs
+        self._finished_jobs = deque()
+        self._lock = threading.Lock()
+        self._logger = Logger("TrainingJobManager")
+
+    def _start(self):
+        if self._executor is None:
+            context = multiprocessing.get_context("spawn")
+            self._manager = context.Manager()
+            self._progress = self._manager.dict()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=context,
+                initializer=configure_training_threads,
+                initargs=(self._intra_op_threads, self._inter_op_threads),
+            )
+            self._logger.info(
+                f"Started {self._max_workers} training workers with "
+                f"{self._intra_op_threads} intra-op and {self._inter_op_threads} inter-op threads"
+            )
+
+    def submit(
+        self,
+        key: ModelKey,
+        target: np.ndarray,
+        watermark: str = None,
+        incremental: bool = False,
+        timestamps: np.ndarray = None,
+    ) -> str:
+        with self._lock:
+            if key in self._active_jobs:
+                job_id = self._active_jobs[key]
+                self._logger.debug(f"Training of {key} already running as {job_id}")
+                return job_id
+
+            self._start()
+            _, _, model_type, window_size = key
+            model_class, model_parameters = self._model_spec(model_type, window_size)
+            inputs = {}
+            if model_class.uses_calendar and timestamps is not None:
+                inputs["timestamps"] = timestamps
+            job_id = uuid.uuid4().hex
+            # Новая версия пишется в собственный каталог и становится текущей
+            # только после публикации указателя.
+            staging_path = self._registry.new_version_path(key)
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "key": list(key),
+                "mode": "incremental" if incremental else "full",
+                "status": "queued",
+                "submitted_at": datetime.now().isoformat(),
+                "finished_at": None,
+                "watermark": watermark,
+                "version": None,
+                "error": None,
+            }
+            self._done[job_id] = Future()
+            self._active_jobs[key] = job_id
+            arguments = [
+                job_id,
+                model_class,
+                model_parameters,
+                target,
+                watermark,
+                staging_path,
+                self._progress,
+            ]
+            if incremental:
+                future = self._executor.submit(
+                    run_fine_tuning,
+                    *arguments,
+                    self._registry.artifact_path(key),
+                    self._fine_tune_epochs,
+                    self._scaler_update,
+                    inputs=inputs,
+                )
+            else:
+                future = self._executor.submit(run_training, *arguments, inputs=inputs)
+            future.add_done_callback(
+                lambda finished: self._publisher.submit(
+                    self._finish, job_id, key, staging_path, finished
+                )
+            )
+            self._logger.info(
+                f"Submitted {self._jobs[job_id]['mode']} training job {job_id} for {key}"
+            )
+            return job_id
+
+    def _finish(self, job_id: str, key: ModelKey, staging_path: str, future):
+        job = self._jobs[job_id]
+        try:
+            job["version"] = future.result()
+            job["status"] = "publishing"
+            self._registry.publish(key, staging_path)
+            job["status"] = "finished"
+            self._logger.info(f"Training job {job_id} for {key} finished")
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            shutil.rmtree(staging_path, ignore_errors=True)
+            self._logger.error(f"Training job {job_id} for {key} failed: {e}")
+        finally:
+            job["finished_at"] = datetime.now().isoformat()
+            done = self._done[job_id]
+            with self._lock:
+                self._active_jobs.pop(key, None)
+                self._finished_jobs.append(job_id)
+                while len(self._finished_jobs) > self._retained_jobs:
+                    expired = self._finished_jobs.popleft()
+                    self._jobs.pop(expired, None)
+                    self._done.pop(expired, None)
+                    self._progress.pop(expired, None)
+            # Future мог отменить кто-то из ожидающих, запись задачи всё равно завершается.
+            if not done.done():
+                if job["status"] == "finished":
+                    done.set_result(job["version"])
+                else:
+                    done.set_exception(Exception(job["error"]))
+
+    async def wait(self, job_id: str) -> str:
+        # Future задачи общий для всех ожидающих её запросов: таймаут одного
+        # запроса не должен отменять его для остальных.
+        return await asyncio.shield(asyncio.wrap_future(self._done[job_id]))
+
+    def status(self, job_id: str) -> dict:
+        if job_id not in self._jobs:
+            raise KeyError(f"Unknown training job {job_id}")
+        job = dict(self._jobs[job_id])
+        progress = self._progress.get(job_id) if self._progress is not None else None
+        if progress is not None:
+            if job["status"] == "queued":
+                job["status"] = "running"
+            job["progress"] = progress
+        return job
+
+    def jobs(self):
+        with self._lock:
+            job_ids = list(self._jobs)
+        return [self.status(job_id) for job_id in job_ids if job_id in self._jobs]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._manager.shutdown()
+            self._executor = None
+        self._publisher.shutdown(wait=False, cancel_futures=True)
@@ -1,9 +1,12 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, Response
+from columnar_format import MEDIA_TYPE, accepts_columnar, encode_columns
 from concrete.db_managers.electricity_db_manager import ElectricityDBManager
 from concrete.fetchers.electricity_fetcher import ElectricityFetcher
 from logger import Logger
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
+import numpy as np
+import os
 
 electricity_service = FastAPI()
 logger = Logger("electricity_service")
@@ -14,7 +17,16 @@ db_manager = ElectricityDBManager(
     user="user",
     password="secret",
 )
-fetcher = ElectricityFetcher()
+# Клиент фетчера живёт всё время работы сервиса; FETCHER_HTTP2=true включает HTTP/2
+# (нужен пакет h2, без него остаётся HTTP/1.1).
+fetcher = ElectricityFetcher(
+    http2=os.environ.get("FETCHER_HTTP2", "false").lower() == "true",
+    max_connections=int(os.environ.get("FETCHER_MAX_CONNECTIONS", 10)),
+    max_keepalive_connections=int(
+        os.environ.get("FETCHER_MAX_KEEPALIVE_CONNECTIONS", 5)
+    ),
+    timeout=float(os.environ.get("FETCHER_TIMEOUT_SECONDS", 10)),
+)
 
 
 def get_date_parts_from_date(date: str) -> dict:
@@ -59,12 +71,28 @@ async def update_data_in_db(from_date: str, till_date: str):
 
 
 @electricity_service.get("/get_data")
-async def get_data(from_date: str, till_date: str):
+async def get_data(from_date: str, till_date: str, accept: str = Header(None)):
     try:
         logger.debug(f"Getting electricity data from {from_date} to {till_date}")
         data = await db_manager.select("electricity", from_date, till_date)
+        if accepts_columnar(accept):
+            logger.info(f"Retrieved electricity data: {len(data)} records as columns")
+            columns = {
+                "timestamp": np.array(
+                    [record.timestamp for record in data], dtype="datetime64[ns]"
+                ),
+                "price": np.array([record.price for record in data], dtype=np.float64),
+            }
+            return Response(
+                content=encode_columns(columns), media_type=MEDIA_TYPE
+            )
         logger.info(f"Retrieved electricity data: {len(data)} records")
         return {"from_date": from_date, "till_date": till_date, "data": data}
     except Exception as e:
         logger.error(f"Error retrieving electricity data: {str(e)}")
         return {"error": str(e)}
+
+
+@electricity_service.on_event("shutdown")
+async def shutdown():
+    await fetcher.close()
@@ -1,9 +1,12 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, Response
+from columnar_format import MEDIA_TYPE, accepts_columnar, encode_columns
 from concrete.db_managers.action_db_manager import ActionDBManager
 from concrete.fetchers.action_fetcher import ActionFetcher
 from logger import Logger
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
+import numpy as np
+import os
 
 finance_service = FastAPI()
 logger = Logger("finance_service")
@@ -14,7 +17,26 @@ db_manager = ActionDBManager(
     user="user",
     password="secret",
 )
-fetcher = ActionFetcher()
+# Клиент фетчера живёт всё время работы сервиса; FETCHER_HTTP2=true включает HTTP/2
+# (нужен пакет h2, без него остаётся HTTP/1.1).
+fetcher = ActionFetcher(
+    http2=os.environ.get("FETCHER_HTTP2", "false").lower() == "true",
+    max_connections=int(os.environ.get("FETCHER_MAX_CONNECTIONS", 10)),
+    max_keepalive_connections=int(
+        os.environ.get("FETCHER_MAX_KEEPALIVE_CONNECTIONS", 5)
+    ),
+    timeout=float(os.environ.get("FETCHER_TIMEOUT_SECONDS", 10)),
+)
+ACTION_COLUMNS = {
+    "close": "close",
+    "open": "open_value",
+    "low": "low",
+    "high": "high",
+    "trendclspr": "trendclspr",
+    "volume": "volume",
+    "value": "value",
+    "numtrades": "numtrades",
+}
 
 
 @finance_service.get("/fetch_data")
@@ -57,10 +79,34 @@ async def update_data_in_db(ticker: str, from_date: str, till_date: str):
             till_tmp_date = from_tmp_date + relativedelta(days=100)
 
 
+def action_columns(data):
+    columns = {
+        "timestamp": np.array([row.timestamp for row in data], dtype="datetime64[ns]")
+    }
+    for column, field in ACTION_COLUMNS.items():
+        columns[column] = np.array(
+            [getattr(row, field) for row in data], dtype=np.float64
+        )
+    return columns
+
+
 @finance_service.get("/get_data")
-async def get_data(ticker: str, from_date: str, till_date: str):
+async def get_data(
+    ticker: str, from_date: str, till_date: str, accept: str = Header(None)
+):
     data = await db_manager.select(ticker, from_date, till_date)
+    if accepts_columnar(accept):
+        logger.info(f"Retrieved {len(data)} records for {ticker} as columns")
+        return Response(
+            content=encode_columns(action_columns(data), {"ticker": ticker}),
+            media_type=MEDIA_TYPE,
+        )
     for row in data:
         row.date_value = row.timestamp.date()
     logger.info(f"Retrieved {len(data)} records for {ticker}: {data}")
     return {"ticker": ticker, "data": data}
+
+
+@finance_service.on_event("shutdown")
+async def shutdown():
+    await fetcher.close()
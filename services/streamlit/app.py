@@ -75,6 +75,35 @@ def plot_prediction(
     dates = [item["timestamp"] for item in prediction_data]
     prices = [item["price"] for item in prediction_data]
 
+    # Квантильные модели отдают границы интервала (например, p10 и p90) рядом с медианой.
+    bands = sorted(
+        (key for key in prediction_data[0] if key[0] == "p" and key[1:].isdigit()),
+        key=lambda key: int(key[1:]),
+    )
+    if len(bands) >= 2:
+        lower, upper = bands[0], bands[-1]
+        fig.add_trace(
+            go.Scatter(
+                x=dates,
+                y=[item[upper] for item in prediction_data],
+                mode="lines",
+                line=dict(width=0),
+                showlegend=False,
+                name=upper.upper(),
+            )
+        )
+        fig.add_trace(
+            go.Scatter(
+                x=dates,
+                y=[item[lower] for item in prediction_data],
+                mode="lines",
+                line=dict(width=0),
+                fill="tonexty",
+                fillcolor="rgba(99, 110, 250, 0.2)",
+                name=f"Интервал {lower.upper()}–{upper.upper()}",
+            )
+        )
+
     fig.add_trace(
         go.Scatter(
             x=dates,
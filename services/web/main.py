@@ -10,6 +10,9 @@ from datetime import date
 webapp = FastAPI()
 templates = Jinja2Templates(directory="templates")
 logger = Logger("webapp")
+# Анализатор отвечает по каждой модели не дольше MODEL_EVALUATION_TIMEOUT_SECONDS (90 с),
+# поэтому ответ с ошибками отдельных моделей успевает прийти до этого таймаута.
+ANALYZER_TIMEOUT = 120.0
 
 
 def cache_results(data):
@@ -83,81 +86,30 @@ async def run_action_flow(request: Request):
             historical_data = finance_response.json()
             logger.info(f"Retrieved {len(historical_data.get("data", []))} records for {ticker}")
 
-            models_response = await client.get("http://analyzer:8004/models")
-            if models_response.status_code != 200:
-                available_models = [
-                    "cnn",
-                    "rnn",
-                    "tft",
-                ]
-                logger.warning(
-                    f"Could not fetch available models, using defaults: {available_models}"
-                )
-            else:
-                available_models = models_response.json().get(
-                    "available_models", ["cnn", "rnn", "tft"]
+            models_response = await client.post(
+                "http://analyzer:8004/analize_and_predict_finance_models",
+                json={
+                    "series": {"from_date": from_date, "till_date": till_date},
+                    "ticker": ticker,
+                    "horizon": 30,
+                },
+                timeout=ANALYZER_TIMEOUT,
+            )
+            if models_response.status_code != 200 or "error" in models_response.json():
+                logger.error(f"Failed to analyze {ticker}: {models_response.text}")
+                return JSONResponse(
+                    status_code=500,
+                    content={"error": "Failed to analyze the specified stock"},
                 )
 
-            logger.info(f"Will use models: {available_models}")
-
-            analysis_results = {}
-            for model_type in available_models:
-                try:
-                    analysis_response = await client.post(
-                        "http://analyzer:8004/analize_finance_data",
-                        json={
-                            "data": historical_data,
-                            "ticker": ticker,
-                            "model_type": model_type,
-                        },
-                        timeout=60.0,
-                    )
-
-                    if analysis_response.status_code == 200:
-                        analysis_results[model_type] = analysis_response.json()
-                        logger.info(f"Successfully analyzed with {model_type}")
-                    else:
-                        logger.error(
-                            f"Failed to analyze with {model_type}: {analysis_response.text}"
-                        )
-                        analysis_results[model_type] = {
-                            "error": f"Analysis failed for {model_type}"
-                        }
-                except Exception as model_error:
-                    logger.error(
-                        f"Error during {model_type} analysis: {str(model_error)}"
-                    )
-                    analysis_results[model_type] = {"error": str(model_error)}
-
-            prediction_results = {}
-            for model_type in available_models:
-                try:
-                    predict_response = await client.post(
-                        "http://analyzer:8004/predict_finance_data",
-                        json={
-                            "data": historical_data,
-                            "ticker": ticker,
-                            "model_type": model_type,
-                            "horizon": 30,
-                        },
-                        timeout=60.0,
-                    )
-
-                    if predict_response.status_code == 200:
-                        prediction_results[model_type] = predict_response.json()
-                        logger.info(f"Successfully predicted with {model_type}")
-                    else:
-                        logger.error(
-                            f"Failed to predict with {model_type}: {predict_response.text}"
-                        )
-                        prediction_results[model_type] = {
-                            "error": f"Prediction failed for {model_type}"
-                        }
-                except Exception as model_error:
-                    logger.error(
-                        f"Error during {model_type} prediction: {str(model_error)}"
-                    )
-                    prediction_results[model_type] = {"error": str(model_error)}
+            analysis_results = models_response.json()["models"]
+            prediction_results = analysis_results
+            available_models = list(analysis_results)
+            for model_type, result in analysis_results.items():
+                if "error" in result:
+                    logger.error(f"Failed to analyze with {model_type}: {result['error']}")
+                else:
+                    logger.info(f"Successfully analyzed and predicted with {model_type}")
             response_content = {
                 "historical_data": historical_data,
                 "analysis": analysis_results,
@@ -212,79 +164,34 @@ async def run_electricity_flow(request: Request):
             historical_data = electricity_response.json()
             logger.info(f"Retrieved {len(historical_data.get('data', []))} records")
 
-            models_response = await client.get("http://analyzer:8004/models")
-            if models_response.status_code != 200:
-                available_models = [
-                    "cnn",
-                    "rnn",
-                    "tft",
-                ]
-                logger.warning(
-                    f"Could not fetch available models, using defaults: {available_models}"
-                )
-            else:
-                available_models = models_response.json().get(
-                    "available_models", ["cnn", "rnn", "tft"]
+            models_response = await client.post(
+                "http://analyzer:8004/analize_and_predict_electricity_models",
+                json={
+                    "series": {
+                        "from_date": from_date,
+                        "till_date": date.today().strftime("%Y-%m-%d"),
+                    },
+                    "horizon": 30,
+                },
+                timeout=ANALYZER_TIMEOUT,
+            )
+            if models_response.status_code != 200 or "error" in models_response.json():
+                logger.error(f"Failed to analyze electricity data: {models_response.text}")
+                return JSONResponse(
+                    status_code=500,
+                    content={"error": "Failed to analyze electricity data"},
                 )
 
-            logger.info(f"Will use models: {available_models}")
-
-            analysis_results = {}
-            for model_type in available_models:
-                try:
-                    analysis_response = await client.post(
-                        "http://analyzer:8004/analize_electricity_data",
-                        json={
-                            "data": historical_data,
-                            "model_type": model_type,
-                        },
-                        timeout=60.0,
-                    )
-
-                    if analysis_response.status_code == 200:
-                        analysis_results[model_type] = analysis_response.json()
-                        logger.info(f"Successfully analyzed electricity data with {model_type}")
-                    else:
-                        logger.error(
-                            f"Failed to analyze electricity data with {model_type}: {analysis_response.text}"
-                        )
-                        analysis_results[model_type] = {
-                            "error": f"Analysis failed for {model_type}"
-                        }
-                except Exception as model_error:
-                    logger.error(
-                        f"Error during electricity {model_type} analysis: {str(model_error)}"
-                    )
-                    analysis_results[model_type] = {"error": str(model_error)}
-
-            prediction_results = {}
-            for model_type in available_models:
-                try:
-                    predict_response = await client.post(
-                        "http://analyzer:8004/predict_electricity_data",
-                        json={
-                            "data": historical_data,
-                            "model_type": model_type,
-                            "horizon": 30,
-                        },
-                        timeout=60.0,
-                    )
-
-                    if predict_response.status_code == 200:
-                        prediction_results[model_type] = predict_response.json()
-                        logger.info(f"Successfully predicted electricity data with {model_type}")
-                    else:
-                        logger.error(
-                            f"Failed to predict electricity data with {model_type}: {predict_response.text}"
-                        )
-                        prediction_results[model_type] = {
-                            "error": f"Prediction failed for {model_type}"
-                        }
-                except Exception as model_error:
+            analysis_results = models_response.json()["models"]
+            prediction_results = analysis_results
+            available_models = list(analysis_results)
+            for model_type, result in analysis_results.items():
+                if "error" in result:
                     logger.error(
-                        f"Error during electricity {model_type} prediction: {str(model_error)}"
+                        f"Failed to analyze electricity data with {model_type}: {result['error']}"
                     )
-                    prediction_results[model_type] = {"error": str(model_error)}
+                else:
+                    logger.info(f"Successfully analyzed and predicted electricity data with {model_type}")
             
             response_content = {
                 "historical_data": historical_data,
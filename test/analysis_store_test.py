@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+from analysis_store import AnalysisStore
+from concrete.analyzing_models.cnn import CNNModel
+from concrete.analyzing_models.ets import ETSModel
+
+KEY = ("electricity", "SE3", "cnn", 5)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AnalysisStore(str(tmp_path / "analysis"))
+
+
+@pytest.fixture
+def model():
+    model = CNNModel(window_size=5)
+    model.scaler.fit(np.array([[-1.0], [1.0]]))
+    model.version = "v1"
+    return model
+
+
+def series(length):
+    return np.sin(np.linspace(0, length / 10, length)).reshape(-1, 1)
+
+
+def test_increments_match_full_analysis(store, model):
+    data = series(80)
+    store.analyze(KEY, model, data[:50])
+    analysis = store.analyze(KEY, model, data)
+    assert analysis == pytest.approx(model.analyze(data))
+    assert store.stats()["analyzed_points"] == 75
+    predictions = store.predictions(KEY)
+    assert len(predictions) == 75
+    windows = model._preprocess(model.scaler.transform(data))
+    fitted = model.scaler.inverse_transform(model._predict_windows(windows))
+    assert np.allclose(predictions, fitted[:, 0], atol=1e-5)
+
+
+def test_state_survives_restart(store, model, tmp_path):
+    data = series(60)
+    store.analyze(KEY, model, data[:40])
+    restarted = AnalysisStore(str(tmp_path / "analysis"))
+    restarted.analyze(KEY, model, data)
+    assert restarted.stats() == {
+        "series": 1,
+        "full_runs": 0,
+        "incremental_runs": 1,
+        "analyzed_points": 20,
+    }
+    assert len(restarted.predictions(KEY)) == 55
+
+
+def test_new_scaling_or_changed_history_starts_over(store, model):
+    data = series(60)
+    store.analyze(KEY, model, data[:40])
+    model.version = "v2"
+    model.scaler.fit(np.array([[-2.0], [2.0]]))
+    store.analyze(KEY, model, data[:50])
+    revised = data.copy()
+    revised[3] += 1
+    analysis = store.analyze(KEY, model, revised)
+    assert store.stats()["full_runs"] == 3
+    assert analysis == pytest.approx(model.analyze(revised))
+    assert len(store.predictions(KEY)) == 55
+
+
+def test_fine_tuned_version_continues_analysis(store, model, tmp_path):
+    data = series(80)
+    store.analyze(KEY, model, data[:50])
+    before = store.predictions(KEY)
+    model.fine_tune(data[:60], epochs=1)
+    version_path = tmp_path / "v2"
+    version_path.mkdir()
+    model.save(str(version_path))
+    tuned = CNNModel(window_size=5)
+    tuned.load(str(version_path))
+    assert tuned.version != "v1"
+
+    store.analyze(KEY, tuned, data)
+    assert store.stats() == {
+        "series": 1,
+        "full_runs": 1,
+        "incremental_runs": 1,
+        "analyzed_points": 75,
+    }
+    predictions = store.predictions(KEY)
+    assert np.allclose(predictions[:45], before)
+    _, fitted = tuned._in_sample(data, 50)
+    assert np.allclose(predictions[45:], tuned.scaler.inverse_transform(fitted)[:, 0], atol=1e-5)
+    assert store._state(KEY)["version"] == tuned.version
+
+
+def test_ets_increment_matches_full_analysis():
+    data = series(200) + 2
+    model = ETSModel(window_size=5, season_lengths=(1, 7))
+    model.train(data[:150])
+    analysis, state, _ = model.analyze_increment(data[:150])
+    analysis, _, predictions = model.analyze_increment(data, state)
+    assert len(predictions) == 50
+    assert analysis == pytest.approx(model.analyze(data))
@@ -0,0 +1,147 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+from abstractions.analyzing_model import SeriesScaler
+from concrete.analyzing_models.cnn import CNNModel
+from concrete.analyzing_models.tft import TFTModel
+
+
+def test_direct_training_pairs_align_with_horizon():
+    model = CNNModel(
+        window_size=5, forecast_mode="direct", output_horizon=3, batch_size=64
+    )
+    data = np.arange(20, dtype=float).reshape(-1, 1)
+    X, y = next(iter(model._training_dataset(data, shuffle=False)))
+    X, y = X.numpy(), y.numpy()
+    assert X.shape == (13, 5, 1)
+    assert y.shape == (13, 3)
+    assert np.array_equal(X[:, -1, 0] + 1, y[:, 0])
+    assert np.array_equal(y[-1], [17, 18, 19])
+
+
+def test_recursive_mode_has_single_output():
+    model = CNNModel(window_size=5, forecast_mode="recursive", output_horizon=30)
+    assert model.output_horizon == 1
+    assert model.model.output_shape[-1] == 1
+
+
+def test_unknown_forecast_mode():
+    with pytest.raises(ValueError):
+        CNNModel(window_size=5, forecast_mode="seq2seq")
+
+
+def test_fine_tune_extends_scaler_with_new_points():
+    model = CNNModel(window_size=5)
+    model.scaler.fit(np.array([[0.0], [1.0]]))
+    model.trained_points = 10
+    model.scaler_update = "extend"
+    data = np.linspace(0, 2, 20).reshape(-1, 1)
+    model.fine_tune(data, epochs=1)
+    assert model.scaler.data_max_[0] == 2.0
+    assert model.trained_points == 10 + 20 - model.fine_tune_lookback
+
+
+def test_tflite_export_matches_keras(tmp_path):
+    model = CNNModel(
+        window_size=5, tflite_quantization="float16", inference_backend="tflite"
+    )
+    model.scaler.fit(np.array([[0.0], [1.0]]))
+    result = model.save(str(tmp_path))
+    assert (tmp_path / "cnn_model.tflite").exists()
+    assert result["tflite_max_delta"] < model.tflite_tolerance
+
+    loaded = CNNModel(window_size=5, inference_backend="tflite")
+    loaded.load(str(tmp_path))
+    assert loaded.active_backend == "tflite"
+    windows = np.random.default_rng(1).random((7, 5, 1)).astype(np.float32)
+    keras_predictions = loaded._inference_function()(windows).numpy()
+    assert np.allclose(loaded._infer(windows), keras_predictions, atol=1e-2)
+
+
+def test_tflite_backend_falls_back_to_keras_over_tolerance(tmp_path):
+    model = CNNModel(window_size=5, tflite_quantization="none")
+    model.scaler.fit(np.array([[0.0], [1.0]]))
+    model.tflite_tolerance = -1.0
+    model.save(str(tmp_path))
+
+    loaded = CNNModel(window_size=5, inference_backend="tflite")
+    loaded.tflite_tolerance = -1.0
+    loaded.load(str(tmp_path))
+    assert loaded.tflite_artifact == "none"
+    assert loaded.active_backend == "keras"
+
+
+def test_predict_uses_only_last_window():
+    model = CNNModel(window_size=5)
+    data = np.sin(np.linspace(0, 6, 60)).reshape(-1, 1)
+    model.scaler.fit(data)
+    forecast = model.predict(data, horizon=3)
+    assert np.allclose(model.predict(data[-5:], horizon=3), forecast)
+    expected = model._infer(model.scaler.transform(data[-5:])[None].astype(np.float32))
+    assert np.isclose(model.scaler.transform(forecast)[0, 0], expected[0, 0], atol=1e-5)
+    with pytest.raises(ValueError):
+        model.predict(data[-4:], horizon=3)
+
+
+def test_series_stays_float32_from_scaler_to_inference():
+    scaler = SeriesScaler().fit(np.linspace(0, 100, 50).reshape(-1, 1))
+    scaled = scaler.transform(np.array([[25.0], [50.0]]))
+    assert scaled.dtype == np.float32 and scaler.scale_.dtype == np.float32
+    assert scaler.inverse_transform(scaled).dtype == np.float32
+    model = CNNModel(window_size=5)
+    with pytest.raises(TypeError):
+        model._forward(np.zeros((1, 5, 1)))
+
+
+def test_legacy_scaler_is_upgraded_on_load(tmp_path):
+    model = CNNModel(window_size=5)
+    model.scaler.fit(np.array([[0.0], [1.0]]))
+    model.save(str(tmp_path))
+    joblib.dump(MinMaxScaler().fit(np.array([[0.0], [2.0]])), tmp_path / "scaler.joblib")
+    restored = CNNModel(window_size=5)
+    restored.load(str(tmp_path))
+    assert isinstance(restored.scaler, SeriesScaler)
+    assert restored.scaler.transform([[1.0]]).tolist() == [[0.5]]
+
+
+def test_warm_up_covers_padded_batch_shapes():
+    model = CNNModel(window_size=5)
+    assert model.inference_batch_sizes(8) == [1, 2, 4, 8]
+    timings = model.warm_up([1, 4])
+    assert list(timings) == [1, 4]
+    assert all(value >= 0 for value in timings.values())
+
+
+def test_tft_quantile_heads_return_ordered_bands(tmp_path):
+    model = TFTModel(
+        window_size=8,
+        forecast_mode="direct",
+        output_horizon=4,
+        quantiles=[0.1, 0.5, 0.9],
+    )
+    assert model.quantiles == [0.5, 0.1, 0.9]
+    data = np.sin(np.linspace(0, 12, 120)).reshape(-1, 1)
+    model.train(data)
+    forecast = model.predict(data, horizon=6)
+    assert forecast.shape == (6, 3)
+    assert (forecast[:, 1] <= forecast[:, 0]).all() and (forecast[:, 0] <= forecast[:, 2]).all()
+    model.save(str(tmp_path))
+    restored = TFTModel(window_size=8)
+    restored.load(str(tmp_path))
+    assert restored.quantiles == [0.5, 0.1, 0.9]
+    assert np.allclose(restored.predict(data, horizon=6), forecast, atol=1e-5)
+
+
+@pytest.mark.parametrize("forecast_mode, output_horizon", [("recursive", 1), ("direct", 3)])
+def test_predict_origins_matches_predict(forecast_mode, output_horizon):
+    model = CNNModel(window_size=5, forecast_mode=forecast_mode, output_horizon=output_horizon)
+    data = np.sin(np.linspace(0, 6, 60)).reshape(-1, 1)
+    model.scaler.fit(data)
+    origins = [20, 31, 45]
+    forecasts = model.predict_origins(data, origins, horizon=7)
+    assert forecasts.shape == (3, 7, 1)
+    for origin, forecast in zip(origins, forecasts):
+        assert np.allclose(forecast, model.predict(data[:origin], horizon=7), atol=1e-5)
+    with pytest.raises(ValueError):
+        model.predict_origins(data, [4], horizon=7)
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backtesting import Backtester, forecast_errors, rolling_origins
+from concrete.analyzing_models.ets import ETSModel
+
+
+def ets_spec(model_type, window_size):
+    return ETSModel, {"window_size": window_size, "season_lengths": (1, 24)}
+
+
+def hourly_series(length):
+    timestamps = pd.date_range("2024-01-01", periods=length, freq="h").to_numpy()
+    steps = np.arange(length)
+    return timestamps, (10 + np.sin(2 * np.pi * steps / 24)).reshape(-1, 1)
+
+
+def test_rolling_origins_leave_room_for_horizon():
+    assert rolling_origins(20, 10, 3, 5) == [10, 13]
+
+
+def test_forecast_errors():
+    errors = forecast_errors(np.array([1.0, 2.0]), np.array([2.0, 2.0]))
+    assert errors == {"mae": 0.5, "rmse": pytest.approx(np.sqrt(0.5)), "mape": 50.0}
+
+
+def test_rerun_only_computes_new_folds():
+    backtester = Backtester("backtests", ets_spec, max_workers=1, refit_every=2)
+    key = ("electricity", "SE3", "ets", 24)
+    timestamps, values = hourly_series(24 * 12)
+    series = {("electricity", "SE3"): (timestamps[:-48], values[:-48])}
+    first = backtester.run([key], series, horizon=12, step=12, initial_size=24 * 6)
+    assert first[key]["folds"] == first[key]["computed_folds"] == 8
+    assert first[key]["mae"] < 0.1
+
+    series = {("electricity", "SE3"): (timestamps, values)}
+    second = backtester.run([key], series, horizon=12, step=12, initial_size=24 * 6)
+    assert second[key]["folds"] == 12
+    assert second[key]["computed_folds"] == 4
+    assert len(backtester.load_folds(key, (12, 12, 24 * 6))) == 12
+
+
+def test_summary_covers_only_requested_grid():
+    backtester = Backtester("backtests", ets_spec, max_workers=1, refit_every=4)
+    key = ("electricity", "SE3", "ets", 24)
+    timestamps, values = hourly_series(24 * 12)
+    full = {("electricity", "SE3"): (timestamps, values)}
+    backtester.run([key], full, horizon=12, step=12, initial_size=24 * 6)
+
+    shorter = {("electricity", "SE3"): (timestamps[:-48], values[:-48])}
+    summary = backtester.run([key], shorter, horizon=12, step=12, initial_size=24 * 6)
+    assert summary[key]["folds"] == 8 and summary[key]["computed_folds"] == 0
+
+    coarser = backtester.run([key], full, horizon=12, step=24, initial_size=24 * 6)
+    assert coarser[key]["folds"] == coarser[key]["computed_folds"] == 6
+    assert len(backtester.load_folds(key, (12, 12, 24 * 6))) == 12
@@ -0,0 +1,32 @@
+import numpy as np
+from columnar_format import MEDIA_TYPE, accepts_columnar, decode_columns, encode_columns
+
+
+def test_columns_round_trip_without_copy():
+    timestamps = np.arange(
+        "2024-01-01T00", "2024-01-03T00", dtype="datetime64[h]"
+    ).astype("datetime64[ns]")
+    prices = np.linspace(1.0, 2.0, len(timestamps))
+    payload = encode_columns(
+        {"timestamp": timestamps, "price": prices, "flag": np.ones(3, dtype="<f4")},
+        {"ticker": "SBER"},
+    )
+    columns, metadata = decode_columns(payload)
+    assert metadata == {"ticker": "SBER"}
+    assert np.array_equal(columns["timestamp"], timestamps)
+    assert np.array_equal(columns["price"], prices)
+    assert columns["flag"].dtype == np.dtype("<f4")
+    assert not columns["price"].flags.owndata
+    assert columns["price"].ctypes.data % 8 == 0
+
+
+def test_big_endian_input_is_stored_little_endian():
+    columns, _ = decode_columns(encode_columns({"x": np.arange(3, dtype=">f8")}))
+    assert columns["x"].dtype == np.dtype("<f8")
+    assert columns["x"].tolist() == [0.0, 1.0, 2.0]
+
+
+def test_accept_header_selects_columnar():
+    assert accepts_columnar(f"{MEDIA_TYPE}, application/json;q=0.5")
+    assert not accepts_columnar("application/json")
+    assert not accepts_columnar(None)
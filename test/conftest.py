@@ -0,0 +1,12 @@
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "services", "analyzer"))
+
+
+@pytest.fixture(autouse=True)
+def logs_dir(tmp_path, monkeypatch):
+    # Logger пишет в logs/ текущего каталога, поэтому каждый тест работает во временном.
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("logs")
@@ -0,0 +1,57 @@
+import asyncio
+import httpx
+import pytest
+from concrete.fetchers.electricity_fetcher import ElectricityFetcher
+
+
+@pytest.fixture
+def requests():
+    return []
+
+
+@pytest.fixture
+def fetcher(requests):
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(
+            200, json=[{"time_start": "2024-01-01T00:00:00+01:00", "EUR_per_kWh": 0.1}]
+        )
+
+    return ElectricityFetcher(
+        max_connections=2, timeout=3.0, transport=httpx.MockTransport(handler)
+    )
+
+
+def test_requests_share_one_client(fetcher, requests):
+    async def refresh():
+        clients = []
+        for day in ("01", "02", "03"):
+            fetcher.set_params({"year": 2024, "month": "01", "day": day})
+            records = await fetcher.fetch_data()
+            assert records[0].price == 0.1
+            clients.append(fetcher._http_client())
+        await fetcher.close()
+        return clients
+
+    clients = asyncio.run(refresh())
+    assert len(requests) == 3
+    assert requests[-1].url.path.endswith("2024/01-03_SE3.json")
+    assert all(client is clients[0] for client in clients)
+    assert clients[0].is_closed and clients[0].timeout.read == 3.0
+
+
+def test_client_is_recreated_after_close(fetcher):
+    async def reopen():
+        first = fetcher._http_client()
+        await fetcher.close()
+        return first, fetcher._http_client()
+
+    first, second = asyncio.run(reopen())
+    assert first.is_closed and not second.is_closed
+
+
+def test_http2_falls_back_without_h2(fetcher, monkeypatch):
+    monkeypatch.setattr("importlib.util.find_spec", lambda name: None)
+    fetcher._http2 = True
+    assert isinstance(fetcher._http_client(), httpx.AsyncClient)
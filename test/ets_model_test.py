@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from concrete.analyzing_models.ets import (
+    ETSModel,
+    final_states,
+    initial_states,
+    smoothing_errors,
+)
+
+
+def seasonal_series(length, season_length=24):
+    steps = np.arange(length)
+    noise = np.random.default_rng(0).normal(0, 0.3, length)
+    return 20 + 0.01 * steps + 5 * np.sin(2 * np.pi * steps / season_length) + noise
+
+
+def explicit_smoothing(series, season_length, alpha, beta, gamma):
+    level, trend, season = initial_states(series, season_length)
+    season = season.copy()
+    errors = []
+    for t, value in enumerate(series):
+        error = value - level - trend - season[t % season_length]
+        errors.append(error)
+        level, trend = level + trend + alpha * error, trend + beta * error
+        season[t % season_length] += gamma * error
+    return np.array(errors), level, trend, season
+
+
+@pytest.mark.parametrize("season_length, gamma", [(1, 0.0), (24, 0.2)])
+def test_filter_matches_explicit_recursion(season_length, gamma):
+    series = seasonal_series(500)
+    errors = smoothing_errors(series, season_length, 0.3, 0.05, gamma)[0]
+    expected_errors, *expected_states = explicit_smoothing(
+        series, season_length, 0.3, 0.05, gamma
+    )
+    states = final_states(series, season_length, 0.3, 0.05, gamma, errors)
+    assert np.allclose(errors, expected_errors)
+    for state, expected in zip(states, expected_states):
+        assert np.allclose(state, expected)
+
+
+def test_training_selects_daily_season_for_hourly_data():
+    data = seasonal_series(24 * 60).reshape(-1, 1)
+    model = ETSModel(season_lengths=(1, 5, 24))
+    model.train(data[:-24])
+    assert model.season_length == 24
+    forecast = model.predict(data[:-24], horizon=24)
+    assert forecast.shape == (24, 1)
+    assert np.mean(np.abs(forecast - data[-24:])) < 1.0
+
+
+def test_fine_tuning_refits_on_full_history():
+    data = seasonal_series(24 * 60).reshape(-1, 1)
+    model = ETSModel(season_lengths=(1, 24))
+    model.train(data[:-48])
+    model.trained_points = len(data) - 48
+    trained = model.predict(data[:-24], horizon=24)
+    model.fine_tune(data[:-24])
+    assert model.trained_points == len(data) - 24
+    tuned = model.predict(data[:-24], horizon=24)
+    full = ETSModel(season_lengths=(1, 24))
+    full.scaler = model.scaler
+    full._select_parameters(model.scaler.transform(data[:-24])[:, 0], (1, 24))
+    assert (model.season_length, model.alpha) == (full.season_length, full.alpha)
+    assert np.mean(np.abs(tuned - data[-24:])) <= np.mean(np.abs(trained - data[-24:])) * 1.1
+
+
+def test_save_and_load_round_trip(tmp_path):
+    data = seasonal_series(24 * 20).reshape(-1, 1)
+    model = ETSModel()
+    model.train(data)
+    model.save(str(tmp_path))
+    assert ETSModel.has_artifact(str(tmp_path))
+    restored = ETSModel()
+    restored.load(str(tmp_path))
+    assert restored.season_length == model.season_length
+    assert restored.version == model.version
+    assert np.allclose(restored.predict(data, 5), model.predict(data, 5))
+
+
+def test_predict_origins_matches_predict():
+    data = seasonal_series(24 * 20).reshape(-1, 1)
+    model = ETSModel(season_lengths=(1, 24))
+    model.train(data[: 24 * 10])
+    origins = [24 * 10, 24 * 12 + 5, 24 * 15]
+    forecasts = model.predict_origins(data, origins, horizon=12)
+    assert forecasts.shape == (3, 12, 1)
+    for origin, forecast in zip(origins, forecasts):
+        assert np.allclose(forecast, model.predict(data[:origin], horizon=12))
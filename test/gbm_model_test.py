@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from concrete.analyzing_models.gbm import GBMModel, calendar_features
+
+
+def hourly_series(length):
+    timestamps = pd.date_range("2024-01-01", periods=length, freq="h")
+    steps = np.arange(length)
+    noise = np.random.default_rng(0).normal(0, 0.2, length)
+    values = 30 + 0.02 * steps + 4 * np.sin(2 * np.pi * steps / 24) + noise
+    return values.reshape(-1, 1), timestamps.to_numpy()
+
+
+def test_calendar_features_match_pandas():
+    timestamps = pd.date_range("2023-12-30 21:00", periods=50, freq="7h")
+    features = calendar_features(timestamps.to_numpy())
+    assert (features[:, 0] == timestamps.hour).all()
+    assert (features[:, 1] == timestamps.dayofweek).all()
+    assert (features[:, 2] == timestamps.month).all()
+
+
+def test_forecast_follows_daily_cycle():
+    data, timestamps = hourly_series(24 * 40)
+    model = GBMModel(window_size=24, boosting_rounds=100)
+    model.train(data[:-24], timestamps=timestamps[:-24])
+    forecast = model.predict(data[:-24], horizon=24, timestamps=timestamps[:-24])
+    assert forecast.shape == (24, 1)
+    assert np.mean(np.abs(forecast - data[-24:])) < 1.5
+
+
+def test_calendar_model_requires_timestamps():
+    data, timestamps = hourly_series(300)
+    model = GBMModel(window_size=24, boosting_rounds=10)
+    model.train(data, timestamps=timestamps)
+    with pytest.raises(ValueError):
+        model.analyze(data)
+
+
+def test_save_load_and_fine_tune(tmp_path):
+    data, timestamps = hourly_series(400)
+    model = GBMModel(window_size=24, boosting_rounds=20)
+    model.train(data)
+    model.save(str(tmp_path))
+    assert GBMModel.has_artifact(str(tmp_path))
+    restored = GBMModel(window_size=24)
+    restored.load(str(tmp_path))
+    assert restored.analyze(data) == pytest.approx(model.analyze(data))
+    assert np.allclose(restored.predict(data, horizon=5), model.predict(data, horizon=5))
+    restored.trained_points = 300
+    restored.fine_tune(data)
+    assert restored.trained_points == 400
+
+
+def test_repeated_fine_tuning_keeps_accuracy():
+    data, timestamps = hourly_series(24 * 50)
+    model = GBMModel(window_size=24, boosting_rounds=100)
+    model.train(data[:1000], timestamps=timestamps[:1000])
+    model.trained_points = 1000
+
+    def holdout_mae():
+        targets, predictions = model._in_sample(data, 1050, timestamps=timestamps)
+        return np.mean(np.abs(targets - predictions))
+
+    before = holdout_mae()
+    for end in range(1001, 1011):
+        model.fine_tune(data[:end], timestamps=timestamps[:end])
+    assert model.trained_points == 1010
+    assert holdout_mae() < before * 1.1
+
+
+def test_predict_origins_matches_predict():
+    data, timestamps = hourly_series(24 * 20)
+    model = GBMModel(window_size=24, boosting_rounds=50)
+    model.train(data[: 24 * 10], timestamps=timestamps[: 24 * 10])
+    origins = [24 * 10, 24 * 12 + 5, 24 * 15]
+    forecasts = model.predict_origins(data, origins, horizon=12, timestamps=timestamps)
+    assert forecasts.shape == (3, 12, 1)
+    for origin, forecast in zip(origins, forecasts):
+        expected = model.predict(data[:origin], horizon=12, timestamps=timestamps[:origin])
+        assert np.allclose(forecast, expected)
@@ -0,0 +1,56 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from inference_scheduler import InferenceScheduler
+
+
+class DoublingModel:
+    def __init__(self):
+        self.batch_sizes = []
+        self.release = threading.Event()
+
+    def _forward(self, windows):
+        self.release.wait(5)
+        self.batch_sizes.append(len(windows))
+        return windows[:, -1] * 2
+
+
+def test_concurrent_requests_share_forward_passes():
+    model = DoublingModel()
+    scheduler = InferenceScheduler(max_batch=64, max_wait_ms=50)
+    windows = [np.full((1, 3, 1), index, dtype=np.float32) for index in range(16)]
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        futures = [executor.submit(scheduler.infer, model, window) for window in windows]
+        model.release.set()
+        results = [future.result() for future in futures]
+    for index, result in enumerate(results):
+        assert result.shape == (1, 1)
+        assert result[0, 0] == index * 2
+    assert len(model.batch_sizes) < len(windows)
+    assert all(size & (size - 1) == 0 for size in model.batch_sizes)
+    assert scheduler.stats()["requests"] == 16
+
+
+def test_batches_do_not_exceed_max_batch():
+    model = DoublingModel()
+    scheduler = InferenceScheduler(max_batch=8, max_wait_ms=50)
+    windows = [np.full((3, 3, 1), index, dtype=np.float32) for index in range(6)]
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        futures = [executor.submit(scheduler.infer, model, window) for window in windows]
+        model.release.set()
+        results = [future.result() for future in futures]
+    for index, result in enumerate(results):
+        assert np.all(result == index * 2)
+    assert max(model.batch_sizes) <= 8
+    assert scheduler.stats()["requests"] == 6
+
+
+def test_forward_errors_reach_every_caller():
+    class BrokenModel:
+        def _forward(self, windows):
+            raise RuntimeError("broken model")
+
+    scheduler = InferenceScheduler()
+    with pytest.raises(RuntimeError, match="broken model"):
+        scheduler.infer(BrokenModel(), np.zeros((2, 3, 1)))
@@ -0,0 +1,159 @@
+import os
+import pytest
+from model_registry import ModelRegistry
+
+
+class FakeModel:
+    version = "1"
+
+    def __init__(self, window_size):
+        self.window_size = window_size
+        self.trained_on = None
+
+    @classmethod
+    def has_artifact(cls, path):
+        return os.path.exists(f"{path}/fake.txt")
+
+    def train(self, data):
+        self.trained_on = data
+
+    def save(self, path):
+        with open(f"{path}/fake.txt", "w") as f:
+            f.write(str(self.trained_on))
+
+    def load(self, path):
+        with open(f"{path}/fake.txt") as f:
+            self.trained_on = f.read()
+
+    def build_inference(self):
+        pass
+
+    def memory_footprint(self):
+        return 2**20
+
+
+@pytest.fixture
+def registry():
+    return ModelRegistry(
+        "saved_models",
+        ["fake"],
+        lambda model_type, window_size: (FakeModel, {"window_size": window_size}),
+        memory_budget_mb=2,
+        model_overhead_mb=0,
+    )
+
+
+def save_version(registry, key, data):
+    version_path = registry.new_version_path(key)
+    os.makedirs(version_path)
+    model = FakeModel(key[3])
+    model.train(data)
+    model.save(version_path)
+    return version_path
+
+
+def train(registry, key, data):
+    registry.publish(key, save_version(registry, key, data))
+
+
+def test_models_are_kept_per_series(registry):
+    train(registry, ("finance", "SBER", "fake", 30), "sber")
+    train(registry, ("finance", "GAZP", "fake", 30), "gazp")
+    sber = registry.get(("finance", "SBER", "fake", 30))
+    gazp = registry.get(("finance", "GAZP", "fake", 30))
+    assert sber is not gazp
+    assert sber.trained_on == "sber"
+    assert gazp.trained_on == "gazp"
+    assert registry.get(("finance", "SBER", "fake", 30)) is sber
+
+
+def test_least_recently_used_model_is_evicted(registry):
+    train(registry, ("finance", "SBER", "fake", 30), "sber")
+    train(registry, ("finance", "GAZP", "fake", 30), "gazp")
+    registry.get(("finance", "SBER", "fake", 30))
+    train(registry, ("finance", "LKOH", "fake", 30), "lkoh")
+    assert registry.loaded_keys() == [
+        ("finance", "SBER", "fake", 30),
+        ("finance", "LKOH", "fake", 30),
+    ]
+    assert registry.memory_usage() == 2 * 2**20
+
+    reloaded = registry.get(("finance", "GAZP", "fake", 30))
+    assert reloaded.trained_on == "gazp"
+
+
+def test_publish_replaces_loaded_model(registry):
+    key = ("finance", "SBER", "fake", 30)
+    train(registry, key, "old")
+    old_model = registry.get(key)
+    train(registry, key, "new")
+    assert registry.get(key) is not old_model
+    assert registry.get(key).trained_on == "new"
+    assert os.listdir("saved_models/finance/SBER") == ["fake_30"]
+
+
+def test_untrained_model(registry):
+    assert not registry.has_artifact(("finance", "SBER", "fake", 30))
+    with pytest.raises(KeyError):
+        registry.get(("finance", "SBER", "fake", 30))
+    with pytest.raises(KeyError):
+        registry.get(("finance", "SBER", "unknown", 30))
+
+
+def test_stored_keys_skip_unpublished_versions(registry):
+    train(registry, ("finance", "SBER", "fake", 30), "sber")
+    os.makedirs(registry.new_version_path(("finance", "GAZP", "fake", 30)))
+    assert registry.stored_keys() == [("finance", "SBER", "fake", 30)]
+
+
+def test_preload_stops_at_memory_budget(registry):
+    keys = [("finance", ticker, "fake", 30) for ticker in ("GAZP", "LKOH", "SBER")]
+    for published_at, key in zip((300, 100, 200), keys):
+        train(registry, key, key[1])
+        os.utime(f"{registry.model_path(key)}/CURRENT", (published_at, published_at))
+    restarted = ModelRegistry(
+        "saved_models",
+        ["fake"],
+        lambda model_type, window_size: (FakeModel, {"window_size": window_size}),
+        memory_budget_mb=2,
+        model_overhead_mb=0,
+    )
+    assert restarted.preload() == [keys[0], keys[2]]
+    assert restarted.loaded_keys() == [keys[2], keys[0]]
+
+
+def test_watcher_hot_swaps_version_published_elsewhere(registry):
+    key = ("finance", "SBER", "fake", 30)
+    train(registry, key, "old")
+    old_model = registry.get(key)
+    other_process = ModelRegistry(
+        "saved_models",
+        ["fake"],
+        lambda model_type, window_size: (FakeModel, {"window_size": window_size}),
+    )
+    other_process.publish(key, save_version(other_process, key, "new"))
+    assert registry.get(key) is old_model
+    assert registry.refresh() == [key]
+    assert registry.get(key).trained_on == "new"
+    assert registry.loaded_version(key) == registry.current_version(key)
+    assert registry.refresh() == []
+
+
+def test_old_versions_are_pruned(registry):
+    key = ("finance", "SBER", "fake", 30)
+    for data in ("v1", "v2", "v3", "v4", "v5"):
+        train(registry, key, data)
+    versions = sorted(os.listdir(f"{registry.model_path(key)}/versions"))
+    assert len(versions) == 3
+    assert versions[-1] == registry.current_version(key)
+
+
+def test_unversioned_artifact_is_still_loaded(registry):
+    key = ("finance", "SBER", "fake", 30)
+    os.makedirs(registry.model_path(key))
+    model = FakeModel(30)
+    model.train("legacy")
+    model.save(registry.model_path(key))
+    assert registry.has_artifact(key)
+    assert registry.get(key).trained_on == "legacy"
+    assert registry.loaded_version(key) is None
@@ -0,0 +1,35 @@
+from prewarm import Prewarmer
+
+
+def test_prewarm_runs_steps_in_background():
+    calls = []
+    prewarmer = Prewarmer([("import", lambda: calls.append("import"))])
+    assert not prewarmer.ready
+    prewarmer.start()
+    assert prewarmer.wait(5)
+    status = prewarmer.status()
+    assert calls == ["import"]
+    assert status["status"] == "ready"
+    assert "import" in status["timings"]
+
+
+def test_failed_prewarm_still_reports_ready():
+    def fail():
+        raise RuntimeError("broken artifact")
+
+    prewarmer = Prewarmer([("models", fail)])
+    prewarmer.start()
+    assert prewarmer.wait(5)
+    assert prewarmer.status()["status"] == "failed"
+    assert prewarmer.status()["error"] == "broken artifact"
+
+
+def test_without_steps_service_is_ready_immediately():
+    assert Prewarmer([]).ready
+
+
+def test_step_details_are_reported():
+    prewarmer = Prewarmer([("warmup", lambda: {"finance/SBER/cnn/30": {1: 12.5}})])
+    prewarmer.start()
+    assert prewarmer.wait(5)
+    assert prewarmer.status()["details"]["warmup"] == {"finance/SBER/cnn/30": {1: 12.5}}
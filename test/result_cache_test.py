@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+import result_cache
+from result_cache import ResultCache
+
+
+@pytest.fixture
+def cache():
+    return ResultCache(max_entries=2, ttl_seconds=10)
+
+
+def test_hits_and_misses_are_counted(cache):
+    assert cache.get(("analysis", 1)) is None
+    cache.put(("analysis", 1), {"mse": 0.1})
+    assert cache.get(("analysis", 1)) == {"mse": 0.1}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire(cache, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(result_cache.time, "monotonic", lambda: now[0])
+    cache.put("a", 1)
+    now[0] += 11
+    assert cache.get("a") is None
+
+
+def test_fingerprint_depends_on_values_and_timestamps():
+    data = pd.DataFrame({"timestamp": ["2024-01-01", "2024-01-02"], "close": [1.0, 2.0]})
+    same = data.copy()
+    shifted = data.assign(timestamp=["2024-01-02", "2024-01-03"])
+    changed = data.assign(close=[1.0, 2.5])
+    assert ResultCache.fingerprint(data) == ResultCache.fingerprint(same)
+    assert ResultCache.fingerprint(data) != ResultCache.fingerprint(shifted)
+    assert ResultCache.fingerprint(data) != ResultCache.fingerprint(changed)
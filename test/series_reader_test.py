@@ -0,0 +1,65 @@
+import asyncio
+import struct
+import httpx
+import numpy as np
+import pytest
+from columnar_format import MEDIA_TYPE, encode_columns
+from series_reader import COPY_SIGNATURE, ServiceSeriesReader, decode_copy
+
+
+def copy_stream(rows):
+    # Формат бинарного COPY PostgreSQL: timestamp — микросекунды от 2000-01-01.
+    body = b"".join(
+        struct.pack(">hiqif", 2, 8, microseconds, 4, value)
+        for microseconds, value in rows
+    )
+    return COPY_SIGNATURE + struct.pack(">ii", 0, 0) + body + struct.pack(">h", -1)
+
+
+def test_decode_copy_returns_columns():
+    day = 86_400_000_000
+    timestamps, values = decode_copy(copy_stream([(0, 1.5), (day, -2.0), (-day, 3.25)]))
+    assert timestamps.dtype == np.dtype("datetime64[ns]")
+    assert list(timestamps.astype(str)) == [
+        "2000-01-01T00:00:00.000000000",
+        "2000-01-02T00:00:00.000000000",
+        "1999-12-31T00:00:00.000000000",
+    ]
+    assert values.dtype == np.float32
+    assert values.tolist() == [1.5, -2.0, 3.25]
+
+
+def test_decode_copy_handles_empty_result():
+    timestamps, values = decode_copy(copy_stream([]))
+    assert len(timestamps) == 0 and len(values) == 0
+
+
+def test_decode_copy_rejects_text_format():
+    with pytest.raises(ValueError):
+        decode_copy(b"2024-01-01\t1.0\n")
+
+
+def test_service_reader_takes_latest_points():
+    timestamps = np.array(
+        ["2024-01-03", "2024-01-01", "2024-01-04", "2024-01-02"], dtype="datetime64[ns]"
+    )
+    payload = encode_columns(
+        {"timestamp": timestamps, "price": np.array([3.0, 1.0, 4.0, 2.0])}
+    )
+
+    def handler(request):
+        return httpx.Response(200, content=payload, headers={"content-type": MEDIA_TYPE})
+
+    reader = ServiceSeriesReader(
+        {"electricity": {"url": "http://electricity/data", "column": "price"}},
+        transport=httpx.MockTransport(handler),
+    )
+
+    async def read():
+        df = await reader.read("electricity", "SE3", "2024-01-01", "2024-01-05", limit=2)
+        await reader.close()
+        return df
+
+    df = asyncio.run(read())
+    assert df["price"].tolist() == [3.0, 4.0]
+    assert list(df["timestamp"].astype(str)) == ["2024-01-03", "2024-01-04"]
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from abstractions.analyzing_model import sliding_windows, window_dataset
+
+
+def loop_windows(data, window_size):
+    sequences = []
+    for i in range(len(data) - window_size):
+        sequences.append(data[i : i + window_size])
+    return np.array(sequences)
+
+
+@pytest.mark.parametrize("length, window_size", [(100, 30), (31, 30), (50, 1)])
+def test_sliding_windows_match_loop(length, window_size):
+    data = np.random.rand(length, 1)
+    assert np.array_equal(sliding_windows(data, window_size), loop_windows(data, window_size))
+
+
+def test_sliding_windows_are_read_only_views():
+    data = np.random.rand(100, 2)
+    windows = sliding_windows(data, 10)
+    assert windows.shape == (90, 10, 2)
+    assert np.shares_memory(windows, data)
+    assert not windows.flags.writeable
+
+
+def test_sliding_windows_short_series():
+    windows = sliding_windows(np.random.rand(30, 1), 30)
+    assert windows.shape == (0, 30, 1)
+
+
+def test_window_dataset_covers_all_windows():
+    data = np.arange(200, dtype=float).reshape(-1, 1)
+    dataset = window_dataset(data, 30, batch_size=32, shuffle=True)
+
+    seen = []
+    for X, y in dataset:
+        X, y = X.numpy(), y.numpy()
+        assert np.array_equal(X[:, -1, 0] + 1, y[:, 0])
+        seen.extend(y[:, 0])
+    assert sorted(seen) == list(data[30:, 0])
+
+
+def test_window_dataset_direct_targets():
+    data = np.arange(50, dtype=float).reshape(-1, 1)
+    X, y = next(iter(window_dataset(data, 10, "direct", 4, batch_size=64)))
+    assert X.shape == (37, 10, 1)
+    assert np.array_equal(y.numpy()[-1], [46, 47, 48, 49])
@@ -0,0 +1,157 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from model_registry import ModelRegistry
+from training_jobs import TrainingJobManager
+
+KEY = ("finance", "SBER", "fake", 30)
+
+
+class FakeModel:
+    version = "1"
+    uses_calendar = False
+    release = threading.Event()
+
+    def __init__(self, window_size):
+        self.window_size = window_size
+        self.trained_on = None
+
+    @classmethod
+    def has_artifact(cls, path):
+        return os.path.exists(f"{path}/fake.txt")
+
+    def train(self, data, callbacks=None):
+        FakeModel.release.wait(30)
+        if len(data) == 0:
+            raise ValueError("empty series")
+        self.trained_on = data
+
+    def save(self, path):
+        with open(f"{path}/fake.txt", "w") as f:
+            f.write(str(len(self.trained_on)))
+
+    def load(self, path):
+        with open(f"{path}/fake.txt") as f:
+            self.trained_on = f.read()
+
+    def build_inference(self):
+        pass
+
+    def memory_footprint(self):
+        return 2**20
+
+    def warm_up(self, batch_sizes=None):
+        return {}
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    FakeModel.release.clear()
+    registry = ModelRegistry(
+        "saved_models",
+        ["fake"],
+        lambda model_type, window_size: (FakeModel, {"window_size": window_size}),
+    )
+    manager = TrainingJobManager(registry, registry._model_spec)
+
+    def start():
+        # Обучение идёт в потоке тестового процесса, а не в пуле процессов.
+        if manager._executor is None:
+            manager._executor = ThreadPoolExecutor(max_workers=1)
+            manager._progress = {}
+
+    monkeypatch.setattr(manager, "_start", start)
+    yield manager
+    FakeModel.release.set()
+    manager._executor.shutdown(wait=True)
+
+
+def series(length=40):
+    return np.arange(length, dtype=float).reshape(-1, 1)
+
+
+def finished(jobs, job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while jobs.status(job_id)["finished_at"] is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return jobs.status(job_id)
+
+
+def test_active_job_is_reused_and_published(jobs):
+    job_id = jobs.submit(KEY, series(), watermark="2024-01-01")
+    assert jobs.submit(KEY, series()) == job_id
+    other_id = jobs.submit(("finance", "GAZP", "fake", 30), series())
+    assert jobs.status(other_id)["status"] == "queued"
+    FakeModel.release.set()
+    job = finished(jobs, job_id)
+    assert job["status"] == "finished"
+    assert job["mode"] == "full" and job["version"] == "1"
+    assert job["progress"]["epoch"] == 0
+    assert jobs._registry.get(KEY).trained_on == "40"
+    assert finished(jobs, other_id)["status"] == "finished"
+    assert jobs.submit(KEY, series()) != job_id
+
+
+def test_failed_job_is_reported_and_cleaned_up(jobs):
+    FakeModel.release.set()
+    job_id = jobs.submit(KEY, series(0))
+    job = finished(jobs, job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "empty series"
+    assert jobs._registry.current_version(KEY) is None
+    assert not jobs._registry.has_artifact(KEY)
+    with pytest.raises(Exception, match="empty series"):
+        asyncio.run(jobs.wait(job_id))
+
+
+def test_timed_out_waiter_does_not_cancel_the_job(jobs):
+    job_id = jobs.submit(KEY, series())
+
+    async def wait_twice():
+        patient = asyncio.create_task(jobs.wait(job_id))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(jobs.wait(job_id), 0.05)
+        FakeModel.release.set()
+        return await patient
+
+    assert asyncio.run(wait_twice()) == "1"
+    assert jobs.status(job_id)["status"] == "finished"
+
+
+def test_cancelled_done_future_does_not_break_finish(jobs):
+    job_id = jobs.submit(KEY, series())
+    jobs._done[job_id].cancel()
+    FakeModel.release.set()
+    assert finished(jobs, job_id)["status"] == "finished"
+    assert jobs._registry.current_version(KEY) is not None
+
+
+def test_publishing_runs_off_the_executor_thread(jobs, monkeypatch):
+    threads = []
+    publish = jobs._registry.publish
+
+    def record_thread(key, path):
+        threads.append(threading.current_thread().name)
+        return publish(key, path)
+
+    monkeypatch.setattr(jobs._registry, "publish", record_thread)
+    FakeModel.release.set()
+    job_id = jobs.submit(KEY, series())
+    assert finished(jobs, job_id)["status"] == "finished"
+    assert threads and threads[0].startswith("training-publish")
+
+
+def test_only_recent_finished_jobs_are_retained(jobs):
+    jobs._retained_jobs = 2
+    FakeModel.release.set()
+    job_ids = []
+    for ticker in ("SBER", "GAZP", "LKOH"):
+        job_ids.append(jobs.submit(("finance", ticker, "fake", 30), series()))
+        finished(jobs, job_ids[-1])
+    assert [job["job_id"] for job in jobs.jobs()] == job_ids[1:]
+    with pytest.raises(KeyError):
+        jobs.status(job_ids[0])